@@ -5,9 +5,13 @@ Supports: Google Geocoding API, OpenCage Geocoder, and Nominatim (free fallback)
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 from typing import Dict, Optional, Tuple
+import threading
 import time
+from collections import OrderedDict
 
 class GeocodingAPI:
     """
@@ -35,12 +39,48 @@ class GeocodingAPI:
         # Rate limiting
         self.last_request_time = 0
         self.min_request_interval = 1.0  # seconds between requests
+        self._rate_limit_lock = threading.Lock()
+        
+        # Persistent HTTP session so repeated lookups reuse keep-alive connections
+        # instead of paying a TCP/TLS handshake per request
+        self._session = requests.Session()
+        retry = Retry(
+            total=2,
+            backoff_factor=0.2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=retry
+        )
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._session.headers.update({'User-Agent': 'SmartEmergencyPredictor/1.0'})
+        
+        # LRU cache of successful lookups; place names and coordinates rarely move
+        self.cache_maxsize = 4096
+        self.cache_ttl = 24 * 3600  # seconds
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         
         # Service status
         if not any([self.google_enabled, self.opencage_enabled]):
             print("⚠ No geocoding API keys configured. Using Nominatim (free) only.")
             print("For better accuracy, add GOOGLE_GEOCODING_API_KEY or OPENCAGE_API_KEY to .env")
     
+    def close(self):
+        """Close the underlying HTTP session and release pooled connections"""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def geocode(self, location_query: str, country_hint: Optional[str] = None) -> Optional[Dict]:
         """
         Geocode a location query (city, address, etc.) to coordinates
@@ -53,6 +93,13 @@ class GeocodingAPI:
         Returns:
             Dictionary with location data or None if not found
         """
+        # Cache hits skip both the request and the rate limit sleep
+        cache_key = ('geocode', location_query.lower().strip(),
+                     country_hint.lower() if country_hint else None)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         # Respect rate limiting
         self._rate_limit()
         
@@ -70,7 +117,8 @@ class GeocodingAPI:
                 result = geocode_func(location_query, country_hint)
                 if result:
                     result['provider'] = provider_name
-                    return result
+                    self._cache_put(cache_key, result)
+                    return dict(result)
             except Exception as e:
                 print(f"  {provider_name} geocoding failed: {e}")
                 continue
@@ -80,8 +128,23 @@ class GeocodingAPI:
     
     def reverse_geocode(self, latitude: float, longitude: float) -> Optional[Dict]:
         """Reverse geocode coordinates to location name"""
+        # Rounded to 4 decimals (~11 m) so nearby lookups share an entry
+        cache_key = ('reverse', round(latitude, 4), round(longitude, 4))
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         self._rate_limit()
         
+        result = self._reverse_geocode_providers(latitude, longitude)
+        if result is not None:
+            self._cache_put(cache_key, result)
+            result = dict(result)
+        
+        return result
+    
+    def _reverse_geocode_providers(self, latitude: float, longitude: float) -> Optional[Dict]:
+        """Ask the providers in order: Google → OpenCage → Nominatim"""
         if self.google_enabled:
             try:
                 return self._reverse_geocode_google(latitude, longitude)
@@ -98,6 +161,30 @@ class GeocodingAPI:
         
         return None
     
+    def _cache_get(self, key):
+        """Return a copy of a cached lookup if present and not expired"""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.cache_ttl:
+                del self._cache[key]
+                return None
+            
+            self._cache.move_to_end(key)
+        
+        return dict(value)
+    
+    def _cache_put(self, key, value):
+        """Store a lookup result, evicting the least recently used entry"""
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), dict(value))
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_maxsize:
+                self._cache.popitem(last=False)
+    
     def _geocode_nominatim(self, location_query: str, country_hint: Optional[str]) -> Optional[Dict]:
         """Geocode using Nominatim (OpenStreetMap)"""
         url = "https://nominatim.openstreetmap.org/search"
@@ -112,9 +199,7 @@ class GeocodingAPI:
         if country_hint:
             params['countrycodes'] = country_hint.lower()
         
-        headers = {'User-Agent': 'SmartEmergencyPredictor/1.0'}
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = self._session.get(url, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -147,7 +232,7 @@ class GeocodingAPI:
         if country_hint:
             params['components'] = f'country:{country_hint}'
         
-        response = requests.get(url, params=params, timeout=10)
+        response = self._session.get(url, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -182,7 +267,7 @@ class GeocodingAPI:
         if country_hint:
             params['countrycode'] = country_hint
         
-        response = requests.get(url, params=params, timeout=10)
+        response = self._session.get(url, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -215,9 +300,7 @@ class GeocodingAPI:
             'addressdetails': 1
         }
         
-        headers = {'User-Agent': 'SmartEmergencyPredictor/1.0'}
-        
-        response = requests.get(url, params=params, headers=headers, timeout=10)
+        response = self._session.get(url, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -240,7 +323,7 @@ class GeocodingAPI:
             'key': self.google_key
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = self._session.get(url, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -266,7 +349,7 @@ class GeocodingAPI:
             'key': self.opencage_key
         }
         
-        response = requests.get(url, params=params, timeout=10)
+        response = self._session.get(url, params=params, timeout=10)
         
         if response.status_code == 200:
             data = response.json()
@@ -285,14 +368,17 @@ class GeocodingAPI:
     
     def _rate_limit(self):
         """Implement rate limiting to respect API policies"""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+        # Held across the sleep so concurrent callers are spaced out one by one
+        # instead of all reading the same last_request_time
+        with self._rate_limit_lock:
+            current_time = time.time()
+            time_since_last_request = current_time - self.last_request_time
+            
+            if time_since_last_request < self.min_request_interval:
+                sleep_time = self.min_request_interval - time_since_last_request
+                time.sleep(sleep_time)
+            
+            self.last_request_time = time.time()
 
 if __name__ == "__main__":
     geo = GeocodingAPI()
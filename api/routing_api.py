@@ -5,9 +5,288 @@ Supports Google Maps API and OpenRouteService API
 """
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import re
+import sys
 import math
+import asyncio
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from types import MappingProxyType
 from datetime import datetime
+from typing import Optional
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# orjson decodes large route payloads (polylines, steps) much faster than stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+except ImportError:
+    import json
+    _json_loads = json.loads
+    
+    def _json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+
+try:
+    import polyline as polyline_codec
+except ImportError:
+    polyline_codec = None
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Shared generator for simulated route jitter
+_rng = np.random.default_rng()
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _gc_dist_kernel(lat1_deg, lon1_deg, lat2_deg, lon2_deg):
+        """Great-circle (Haversine) distance in kilometers between two points in degrees"""
+        lat1 = math.radians(lat1_deg)
+        lat2 = math.radians(lat2_deg)
+        dlat = lat2 - lat1
+        dlon = math.radians(lon2_deg) - math.radians(lon1_deg)
+        
+        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        
+        return 6371.0 * c
+    
+    @njit(cache=True)
+    def _decode_polyline_kernel(buf):
+        """Decode polyline bytes into an (N, 2) array of 1e5-scaled lat/lon integers"""
+        n = buf.shape[0]
+        # Every encoded value takes at least one byte, so a point takes at least two
+        out = np.empty((n // 2 + 1, 2), dtype=np.int64)
+        index = 0
+        count = 0
+        lat = 0
+        lng = 0
+        
+        while index < n:
+            for axis in range(2):
+                shift = 0
+                result = 0
+                
+                while index < n:
+                    b = np.int64(buf[index]) - 63
+                    index += 1
+                    result |= (b & 0x1f) << shift
+                    shift += 5
+                    if b < 0x20:
+                        break
+                
+                delta = ~(result >> 1) if result & 1 else result >> 1
+                if axis == 0:
+                    lat += delta
+                else:
+                    lng += delta
+            
+            out[count, 0] = lat
+            out[count, 1] = lng
+            count += 1
+        
+        return out[:count]
+
+# slots=True needs Python 3.10+; older interpreters get a regular dataclass
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Kilometers per degree of arc on a sphere of radius 6371 km
+_KM_PER_DEGREE = math.radians(6371.0)
+
+def _equirect_km(lat1, lon1, lat2, lon2):
+    """Equirectangular (flat-earth) distance in km; sub-meter accurate over a few km"""
+    x = (lon2 - lon1) * math.cos(math.radians((lat1 + lat2) / 2))
+    return math.hypot(x, lat2 - lat1) * _KM_PER_DEGREE
+
+@lru_cache(maxsize=4096)
+def _great_circle_km(lat1, lon1, lat2, lon2):
+    """Distance in km between two points in degrees, memoized for repeat queries"""
+    # Points within ~5km: the flat-earth approximation is cheaper and accurate enough
+    if abs(lat1 - lat2) < 0.05 and abs(lon1 - lon2) < 0.05:
+        return _equirect_km(lat1, lon1, lat2, lon2)
+    
+    if NUMBA_AVAILABLE:
+        return _gc_dist_kernel(lat1, lon1, lat2, lon2)
+    
+    # Earth radius in kilometers
+    R = 6371.0
+    
+    lat1, lon1 = math.radians(lat1), math.radians(lon1)
+    lat2, lon2 = math.radians(lat2), math.radians(lon2)
+    
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    
+    a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+    
+    return R * c
+
+# Strips every HTML tag (<b>, <div ...>, <wbr/>) from Google step instructions;
+# an opening <div> starts a new sentence, so it becomes a space first
+_HTML_DIV_RE = re.compile(r'<div[^>]*>')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+
+# Transportation mode -> OpenRouteService profile
+_ORS_PROFILES = MappingProxyType({
+    'driving': 'driving-car',
+    'walking': 'foot-walking',
+    'bicycling': 'cycling-regular'
+})
+
+@dataclass(**_DATACLASS_SLOTS)
+class RouteResult:
+    """
+    Route returned by RoutingAPI
+    
+    Supports dict-style access (route['distance'], route.get('coordinates'))
+    so existing callers keep working; use to_dict() at serialization boundaries.
+    """
+    distance: float  # km
+    duration: float  # minutes
+    service: str
+    coordinates: Optional[np.ndarray] = None  # (N, 2) array of (lat, lon) rows
+    steps: list = field(default_factory=list)
+    duration_in_traffic: Optional[float] = None
+    simulated: bool = False
+    start_address: Optional[str] = None
+    end_address: Optional[str] = None
+    warnings: Optional[tuple] = None
+    route_name: Optional[str] = None
+    
+    def __getitem__(self, key):
+        if key not in _ROUTE_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def __setitem__(self, key, value):
+        if key not in _ROUTE_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+    
+    def __contains__(self, key):
+        return key in _ROUTE_FIELDS and getattr(self, key) is not None
+    
+    def get(self, key, default=None):
+        """Return a field value, or default if the field is unset (None)"""
+        value = getattr(self, key, None) if key in _ROUTE_FIELDS else None
+        return default if value is None else value
+    
+    def to_dict(self):
+        """Convert to a plain dict, omitting unset fields"""
+        return {name: getattr(self, name) for name in _ROUTE_FIELDS if getattr(self, name) is not None}
+
+_ROUTE_FIELDS = frozenset(f.name for f in fields(RouteResult))
+
+class _RoutingMicroBatcher:
+    """
+    Coalesces concurrent route lookups into OpenRouteService matrix requests
+    
+    Lookups submitted within max_wait_ms of each other (up to max_batch_size)
+    share one matrix call; each caller still awaits its own result.
+    """
+    
+    def __init__(self, routing_api, mode='driving', max_batch_size=16, max_wait_ms=10):
+        self.routing_api = routing_api
+        self.mode = mode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        
+        # Queue and worker task are bound to the event loop that created them
+        self._loop = None
+        self._queue = None
+        self._task = None
+    
+    async def submit(self, start_coords, end_coords):
+        """Queue a lookup and wait for the batch containing it to complete"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run_loop())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((start_coords, end_coords, future))
+        return await future
+    
+    async def _run_loop(self):
+        """Collect queued lookups into batches and dispatch them"""
+        while True:
+            batch = [await self._queue.get()]
+            
+            # Give concurrent callers a short window to join this batch
+            if self._queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.max_wait)
+            
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            
+            # A failed batch must not take the worker down with it: its callers
+            # get the error, and later submissions are still served
+            try:
+                await self._dispatch(batch)
+            except asyncio.CancelledError:
+                for _, _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+    
+    async def _dispatch(self, batch):
+        """Resolve a batch of lookups with a single matrix request"""
+        # Request each distinct origin and destination once; callers sharing
+        # a point share its row or column
+        source_index = {}
+        destination_index = {}
+        for start_coords, end_coords, _ in batch:
+            source_index.setdefault(tuple(start_coords), len(source_index))
+            destination_index.setdefault(tuple(end_coords), len(destination_index))
+        
+        matrix = await asyncio.to_thread(
+            self.routing_api._ors_matrix, list(source_index), list(destination_index), self.mode
+        )
+        
+        for start_coords, end_coords, future in batch:
+            if future.done():
+                continue
+            
+            try:
+                i = source_index[tuple(start_coords)]
+                j = destination_index[tuple(end_coords)]
+                distance = matrix['distances'][i][j]
+                duration = matrix['durations'][i][j]
+            except (IndexError, KeyError, TypeError):
+                # No matrix, or a malformed one: fall back like a failed request
+                distance = duration = None
+            
+            if distance is not None and duration is not None:
+                summary = RouteResult(
+                    distance=distance / 1000,  # Convert to km
+                    duration=duration / 60,  # Convert to minutes
+                    service='openroute'
+                )
+            else:
+                summary = self.routing_api._get_simulated_route(start_coords, end_coords)
+            
+            future.set_result(summary)
 
 class RoutingAPI:
     """
@@ -31,6 +310,16 @@ class RoutingAPI:
         elif service == 'openroute':
             self.api_key = api_key or os.getenv('OPENROUTE_API_KEY', 'YOUR_OPENROUTE_API_KEY_HERE')
             self.base_url = "https://api.openrouteservice.org"
+            
+            # Request invariants; only the coordinates change between calls
+            self._ors_headers = {
+                'Authorization': self.api_key,
+                'Content-Type': 'application/json'
+            }
+            self._ors_url_for_profile = {
+                profile: f"{self.base_url}/v2/directions/{profile}"
+                for profile in _ORS_PROFILES.values()
+            }
         else:
             print(f"Unknown routing service: {service}")
             self.api_key = None
@@ -40,6 +329,48 @@ class RoutingAPI:
         if not self.enabled:
             print("Routing API not configured. Using simulated routes.")
             print(f"To enable: Set {service.upper()}_API_KEY environment variable")
+        
+        # Persistent HTTP session so TCP/TLS connections are reused across calls.
+        # Transient 429/5xx responses are retried with exponential backoff before
+        # falling back to a simulated route; both Directions GETs and ORS POSTs are
+        # safe to repeat.
+        self._session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.25,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=frozenset(['GET', 'POST']),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=32,
+            max_retries=retry
+        )
+        self._session.mount('https://', adapter)
+        self._session.headers.update({'Connection': 'keep-alive'})
+        
+        # Bounded LRU cache of API routes keyed on rounded coordinates (~11m)
+        self.cache_maxsize = 1024
+        self.cache_ttl = 60  # seconds; traffic-aware durations go stale quickly
+        self._route_cache = OrderedDict()
+        self._route_cache_lock = threading.Lock()
+        
+        # Created on first use by get_route_summary_async
+        self._batcher = None
+    
+    def close(self):
+        """Close the underlying HTTP session and release pooled connections"""
+        if self._batcher is not None and self._batcher._task is not None:
+            self._batcher._task.cancel()
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
     
     def get_optimal_route(self, start_coords, end_coords, mode='driving', optimize_for='time'):
         """
@@ -52,132 +383,287 @@ class RoutingAPI:
             optimize_for: Optimization criteria ('time' or 'distance')
         
         Returns:
-            dict: Route information including distance, duration, and coordinates
+            RouteResult: Route information including distance, duration, and coordinates
         """
         if not self.enabled:
             return self._get_simulated_route(start_coords, end_coords)
         
+        cache_key = self._route_cache_key(start_coords, end_coords, mode, optimize_for)
+        cached_route = self._cache_get(cache_key)
+        if cached_route is not None:
+            return cached_route
+        
         if self.service == 'google':
-            return self._get_google_route(start_coords, end_coords, mode, optimize_for)
+            route = self._get_google_route(start_coords, end_coords, mode, optimize_for)
         elif self.service == 'openroute':
-            return self._get_openroute_route(start_coords, end_coords, mode)
+            route = self._get_openroute_route(start_coords, end_coords, mode)
         else:
             return self._get_simulated_route(start_coords, end_coords)
+        
+        self._cache_put(cache_key, route)
+        return route
     
-    def _get_google_route(self, start_coords, end_coords, mode, optimize_for):
-        """Get route using Google Maps Directions API"""
-        try:
-            url = f"{self.base_url}/directions/json"
+    def _route_cache_key(self, start_coords, end_coords, mode, optimize_for):
+        """Build a route cache key with coordinates rounded to 4 decimals"""
+        return (
+            self.service, mode, optimize_for,
+            round(start_coords[0], 4), round(start_coords[1], 4),
+            round(end_coords[0], 4), round(end_coords[1], 4)
+        )
+    
+    def _cache_get(self, key):
+        """Return a cached route if present and not expired"""
+        with self._route_cache_lock:
+            entry = self._route_cache.get(key)
+            if entry is None:
+                return None
             
-            params = {
-                'origin': f"{start_coords[0]},{start_coords[1]}",
-                'destination': f"{end_coords[0]},{end_coords[1]}",
-                'mode': mode,
-                'alternatives': True,
-                'key': self.api_key
-            }
+            stored_at, route = entry
+            if time.monotonic() - stored_at > self.cache_ttl:
+                del self._route_cache[key]
+                return None
+            
+            self._route_cache.move_to_end(key)
+            return route
+    
+    def _cache_put(self, key, route):
+        """Store a route from the API, evicting the least recently used entry"""
+        # Don't cache simulated fallbacks produced by API errors
+        if not route or route.get('simulated'):
+            return
+        
+        with self._route_cache_lock:
+            self._route_cache[key] = (time.monotonic(), route)
+            self._route_cache.move_to_end(key)
+            if len(self._route_cache) > self.cache_maxsize:
+                self._route_cache.popitem(last=False)
+    
+    def _build_google_request(self, start_coords, end_coords, mode, alternatives=False):
+        """
+        Build URL and query parameters for a Google Directions request
+        
+        Alternatives are only requested when the caller will use them, which keeps
+        the response (and the JSON to decode) to a single route otherwise.
+        """
+        url = f"{self.base_url}/directions/json"
+        
+        params = {
+            'origin': f"{start_coords[0]},{start_coords[1]}",
+            'destination': f"{end_coords[0]},{end_coords[1]}",
+            'mode': mode,
+            'alternatives': alternatives,
+            'key': self.api_key
+        }
+        
+        # Add traffic model for driving
+        if mode == 'driving':
+            params['departure_time'] = 'now'
+            params['traffic_model'] = 'best_guess'
+        
+        return url, params
+    
+    def _google_route_to_data(self, route):
+        """Convert a single route from a Google Directions payload into route data"""
+        leg = route['legs'][0]
+        
+        # Extract route coordinates from polyline
+        polyline = route['overview_polyline']['points']
+        coordinates = self._decode_polyline(polyline)
+        
+        duration_value = leg['duration']['value']
+        duration_in_traffic = leg.get('duration_in_traffic')
+        traffic_value = duration_in_traffic['value'] if duration_in_traffic else duration_value
+        
+        return RouteResult(
+            distance=leg['distance']['value'] / 1000,  # Convert to km
+            duration=duration_value / 60,  # Convert to minutes
+            duration_in_traffic=traffic_value / 60,
+            start_address=leg['start_address'],
+            end_address=leg['end_address'],
+            coordinates=coordinates,
+            steps=self._extract_steps(leg['steps']),
+            warnings=tuple(route.get('warnings', ())),
+            service='google'
+        )
+    
+    def _parse_google_response(self, data, start_coords, end_coords, return_all_alternates=False):
+        """
+        Convert a Google Directions JSON payload into route data
+        
+        Returns:
+            RouteResult: Best route, or a list of routes (primary first) when
+            return_all_alternates is True
+        """
+        if data['status'] == 'OK' and data['routes']:
+            if return_all_alternates:
+                return [self._google_route_to_data(route) for route in data['routes']]
             
-            # Add traffic model for driving
-            if mode == 'driving':
-                params['departure_time'] = 'now'
-                params['traffic_model'] = 'best_guess'
+            # Select best route based on optimization criteria
+            return self._google_route_to_data(data['routes'][0])
+        else:
+            print(f"Google API status: {data['status']}")
+            return self._simulated_fallback(start_coords, end_coords, return_all_alternates)
+    
+    def _simulated_fallback(self, start_coords, end_coords, as_list=False):
+        """Simulated route used when an API request fails, optionally wrapped in a list"""
+        route = self._get_simulated_route(start_coords, end_coords)
+        return [route] if as_list else route
+    
+    def _get_google_route(self, start_coords, end_coords, mode, optimize_for, return_all_alternates=False):
+        """
+        Get route using Google Maps Directions API
+        
+        With return_all_alternates, a single request with alternatives=true returns
+        every route Google suggests as a list (primary first).
+        """
+        try:
+            url, params = self._build_google_request(start_coords, end_coords, mode, return_all_alternates)
             
-            response = requests.get(url, params=params, timeout=15)
+            response = self._session.get(url, params=params, timeout=15)
             
             if response.status_code == 200:
-                data = response.json()
-                
-                if data['status'] == 'OK' and data['routes']:
-                    # Select best route based on optimization criteria
-                    route = data['routes'][0]
-                    leg = route['legs'][0]
-                    
-                    # Extract route coordinates from polyline
-                    polyline = route['overview_polyline']['points']
-                    coordinates = self._decode_polyline(polyline)
-                    
-                    route_data = {
-                        'distance': leg['distance']['value'] / 1000,  # Convert to km
-                        'duration': leg['duration']['value'] / 60,  # Convert to minutes
-                        'duration_in_traffic': leg.get('duration_in_traffic', {}).get('value', leg['duration']['value']) / 60,
-                        'start_address': leg['start_address'],
-                        'end_address': leg['end_address'],
-                        'coordinates': coordinates,
-                        'steps': self._extract_steps(leg['steps']),
-                        'warnings': route.get('warnings', []),
-                        'service': 'google'
-                    }
-                    
-                    return route_data
-                else:
-                    print(f"Google API status: {data['status']}")
-                    return self._get_simulated_route(start_coords, end_coords)
+                return self._parse_google_response(
+                    _json_loads(response.content), start_coords, end_coords, return_all_alternates
+                )
             else:
                 print(f"Google API error: {response.status_code}")
-                return self._get_simulated_route(start_coords, end_coords)
+                return self._simulated_fallback(start_coords, end_coords, return_all_alternates)
                 
         except Exception as e:
             print(f"Error fetching Google route: {e}")
-            return self._get_simulated_route(start_coords, end_coords)
+            return self._simulated_fallback(start_coords, end_coords, return_all_alternates)
     
-    def _get_openroute_route(self, start_coords, end_coords, mode):
-        """Get route using OpenRouteService API"""
-        try:
-            # Convert mode to OpenRouteService profile
-            profile_map = {
-                'driving': 'driving-car',
-                'walking': 'foot-walking',
-                'bicycling': 'cycling-regular'
-            }
-            profile = profile_map.get(mode, 'driving-car')
-            
-            url = f"{self.base_url}/v2/directions/{profile}"
-            
-            headers = {
-                'Authorization': self.api_key,
-                'Content-Type': 'application/json'
+    def _openroute_profile(self, mode):
+        """Convert a transportation mode to an OpenRouteService profile"""
+        return _ORS_PROFILES.get(mode, 'driving-car')
+    
+    def _build_openroute_request(self, start_coords, end_coords, mode, num_alternatives=1):
+        """Build URL, headers and JSON body for an OpenRouteService request"""
+        url = self._ors_url_for_profile[self._openroute_profile(mode)]
+        headers = self._ors_headers
+        
+        body = {
+            'coordinates': [
+                [start_coords[1], start_coords[0]],  # ORS uses [lon, lat]
+                [end_coords[1], end_coords[0]]
+            ],
+            'instructions': True,
+            'elevation': False
+        }
+        
+        if num_alternatives > 1:
+            body['alternative_routes'] = {
+                'target_count': num_alternatives,
+                'weight_factor': 1.4,
+                'share_factor': 0.6
             }
+        
+        return url, headers, body
+    
+    def _openroute_route_to_data(self, route):
+        """Convert a single route from an OpenRouteService payload into route data"""
+        # Extract coordinates, swapping ORS [lon, lat] columns back to [lat, lon]
+        coordinates = np.asarray(route['geometry']['coordinates'], dtype=float)[:, [1, 0]]
+        
+        return RouteResult(
+            distance=route['summary']['distance'] / 1000,  # Convert to km
+            duration=route['summary']['duration'] / 60,  # Convert to minutes
+            coordinates=coordinates,
+            steps=self._extract_openroute_steps(route.get('segments', [])),
+            service='openroute'
+        )
+    
+    def _parse_openroute_response(self, data, start_coords, end_coords, return_all_alternates=False):
+        """
+        Convert an OpenRouteService JSON payload into route data
+        
+        Returns:
+            RouteResult: Best route, or a list of routes (primary first) when
+            return_all_alternates is True
+        """
+        if 'routes' in data and data['routes']:
+            if return_all_alternates:
+                return [self._openroute_route_to_data(route) for route in data['routes']]
             
-            body = {
-                'coordinates': [
-                    [start_coords[1], start_coords[0]],  # ORS uses [lon, lat]
-                    [end_coords[1], end_coords[0]]
-                ],
-                'instructions': True,
-                'elevation': False
-            }
+            return self._openroute_route_to_data(data['routes'][0])
+        else:
+            return self._simulated_fallback(start_coords, end_coords, return_all_alternates)
+    
+    def _get_openroute_route(self, start_coords, end_coords, mode, num_alternatives=1):
+        """
+        Get route using OpenRouteService API
+        
+        With num_alternatives > 1, ORS alternative routes are requested in the same
+        call and a list of routes (primary first) is returned.
+        """
+        return_all = num_alternatives > 1
+        
+        try:
+            url, headers, body = self._build_openroute_request(start_coords, end_coords, mode, num_alternatives)
             
-            response = requests.post(url, json=body, headers=headers, timeout=15)
+            response = self._session.post(url, data=_json_dumps(body), headers=headers, timeout=15)
             
             if response.status_code == 200:
-                data = response.json()
-                
-                if 'routes' in data and data['routes']:
-                    route = data['routes'][0]
-                    
-                    # Extract coordinates
-                    coordinates = [
-                        (coord[1], coord[0])  # Convert back to [lat, lon]
-                        for coord in route['geometry']['coordinates']
-                    ]
-                    
-                    route_data = {
-                        'distance': route['summary']['distance'] / 1000,  # Convert to km
-                        'duration': route['summary']['duration'] / 60,  # Convert to minutes
-                        'coordinates': coordinates,
-                        'steps': self._extract_openroute_steps(route.get('segments', [])),
-                        'service': 'openroute'
-                    }
-                    
-                    return route_data
-                else:
-                    return self._get_simulated_route(start_coords, end_coords)
+                return self._parse_openroute_response(
+                    _json_loads(response.content), start_coords, end_coords, return_all
+                )
             else:
                 print(f"OpenRoute API error: {response.status_code}")
-                return self._get_simulated_route(start_coords, end_coords)
+                return self._simulated_fallback(start_coords, end_coords, return_all)
                 
         except Exception as e:
             print(f"Error fetching OpenRoute route: {e}")
+            return self._simulated_fallback(start_coords, end_coords, return_all)
+    
+    async def _get_optimal_route_async(self, start_coords, end_coords, session, mode='driving'):
+        """
+        Asynchronous counterpart of get_optimal_route
+        
+        Args:
+            start_coords: Tuple of (latitude, longitude) for start point
+            end_coords: Tuple of (latitude, longitude) for end point
+            session: aiohttp.ClientSession used for the request
+            mode: Transportation mode ('driving', 'walking', 'bicycling')
+        
+        Returns:
+            RouteResult: Route information including distance, duration, and coordinates
+        """
+        if not self.enabled or self.service not in ('google', 'openroute'):
+            return self._get_simulated_route(start_coords, end_coords)
+        
+        cache_key = self._route_cache_key(start_coords, end_coords, mode, 'time')
+        cached_route = self._cache_get(cache_key)
+        if cached_route is not None:
+            return cached_route
+        
+        route = await self._fetch_route_async(start_coords, end_coords, session, mode)
+        self._cache_put(cache_key, route)
+        return route
+    
+    async def _fetch_route_async(self, start_coords, end_coords, session, mode):
+        """Issue the routing request for _get_optimal_route_async"""
+        try:
+            if self.service == 'google':
+                url, params = self._build_google_request(start_coords, end_coords, mode)
+                # aiohttp only accepts str/int/float query values
+                params = {k: str(v).lower() if isinstance(v, bool) else v for k, v in params.items()}
+                async with session.get(url, params=params, timeout=aiohttp.ClientTimeout(total=15)) as response:
+                    if response.status != 200:
+                        print(f"Google API error: {response.status}")
+                        return self._get_simulated_route(start_coords, end_coords)
+                    data = _json_loads(await response.read())
+                return self._parse_google_response(data, start_coords, end_coords)
+            else:
+                url, headers, body = self._build_openroute_request(start_coords, end_coords, mode)
+                async with session.post(url, data=_json_dumps(body), headers=headers, timeout=aiohttp.ClientTimeout(total=15)) as response:
+                    if response.status != 200:
+                        print(f"OpenRoute API error: {response.status}")
+                        return self._get_simulated_route(start_coords, end_coords)
+                    data = _json_loads(await response.read())
+                return self._parse_openroute_response(data, start_coords, end_coords)
+                
+        except Exception as e:
+            print(f"Error fetching {self.service} route: {e}")
             return self._get_simulated_route(start_coords, end_coords)
     
     def _get_simulated_route(self, start_coords, end_coords):
@@ -190,7 +676,7 @@ class RoutingAPI:
             end_coords: Tuple of (latitude, longitude)
         
         Returns:
-            dict: Simulated route data
+            RouteResult: Simulated route data
         """
         # Calculate straight-line distance using Haversine formula
         distance_km = self._haversine_distance(start_coords, end_coords)
@@ -205,27 +691,28 @@ class RoutingAPI:
         num_waypoints = max(5, int(distance_km * 2))
         coordinates = self._interpolate_path(start_coords, end_coords, num_waypoints)
         
-        route_data = {
-            'distance': round(road_distance, 2),
-            'duration': round(duration_minutes, 1),
-            'duration_in_traffic': round(duration_minutes * 1.2, 1),  # Add 20% for traffic
-            'coordinates': coordinates,
-            'steps': [
+        route_data = RouteResult(
+            distance=round(road_distance, 2),
+            duration=round(duration_minutes, 1),
+            duration_in_traffic=round(duration_minutes * 1.2, 1),  # Add 20% for traffic
+            coordinates=coordinates,
+            steps=[
                 {
                     'instruction': 'Head to emergency location',
                     'distance': road_distance,
                     'duration': duration_minutes
                 }
             ],
-            'service': 'simulated',
-            'simulated': True
-        }
+            service='simulated',
+            simulated=True
+        )
         
         return route_data
     
     def _haversine_distance(self, coord1, coord2):
         """
         Calculate distance between two coordinates using Haversine formula
+        (equirectangular approximation for points within ~5km)
         
         Args:
             coord1: Tuple of (latitude, longitude)
@@ -234,22 +721,32 @@ class RoutingAPI:
         Returns:
             float: Distance in kilometers
         """
-        # Earth radius in kilometers
-        R = 6371.0
+        return _great_circle_km(float(coord1[0]), float(coord1[1]), float(coord2[0]), float(coord2[1]))
+    
+    def _haversine_bulk(self, origin, targets):
+        """
+        Calculate Haversine distances from one origin to many targets at once
         
-        lat1, lon1 = math.radians(coord1[0]), math.radians(coord1[1])
-        lat2, lon2 = math.radians(coord2[0]), math.radians(coord2[1])
+        Args:
+            origin: Tuple of (latitude, longitude)
+            targets: Array-like of shape (N, 2) with (latitude, longitude) rows
+        
+        Returns:
+            np.ndarray: Distances in kilometers, shape (N,)
+        """
+        targets = np.asarray(targets, dtype=float).reshape(-1, 2)
+        
+        lat1 = np.radians(origin[0])
+        lat2 = np.radians(targets[:, 0])
         
         dlat = lat2 - lat1
-        dlon = lon2 - lon1
+        dlon = np.radians(targets[:, 1]) - np.radians(origin[1])
         
-        a = math.sin(dlat/2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin(dlon/2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1-a))
+        a = np.sin(dlat/2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon/2)**2
         
-        distance = R * c
-        return distance
+        return 6371.0 * 2 * np.arcsin(np.sqrt(a))
     
-    def _interpolate_path(self, start_coords, end_coords, num_points):
+    def _interpolate_path(self, start_coords, end_coords, num_points, rng=None):
         """
         Create interpolated path between two points
         
@@ -257,27 +754,22 @@ class RoutingAPI:
             start_coords: Start coordinates
             end_coords: End coordinates
             num_points: Number of intermediate points
+            rng: Optional numpy Generator for the jitter (defaults to a shared one)
         
         Returns:
-            list: List of (lat, lon) tuples
+            np.ndarray: Array of shape (N, 2) with (lat, lon) rows
         """
-        path = []
+        t = np.linspace(0.0, 1.0, num_points + 1)
         
-        for i in range(num_points + 1):
-            t = i / num_points
-            
-            lat = start_coords[0] + t * (end_coords[0] - start_coords[0])
-            lon = start_coords[1] + t * (end_coords[1] - start_coords[1])
-            
-            # Add slight randomness to simulate road curvature
-            if 0 < i < num_points:
-                import random
-                lat += random.uniform(-0.001, 0.001)
-                lon += random.uniform(-0.001, 0.001)
-            
-            path.append((lat, lon))
+        lats = start_coords[0] + t * (end_coords[0] - start_coords[0])
+        lons = start_coords[1] + t * (end_coords[1] - start_coords[1])
+        
+        # Add slight randomness to intermediate points to simulate road curvature
+        jitter = (rng or _rng).uniform(-0.001, 0.001, size=(2, max(num_points - 1, 0)))
+        lats[1:-1] += jitter[0]
+        lons[1:-1] += jitter[1]
         
-        return path
+        return np.column_stack((lats, lons))
     
     def _decode_polyline(self, polyline_str):
         """
@@ -287,60 +779,70 @@ class RoutingAPI:
             polyline_str: Encoded polyline string
         
         Returns:
-            list: List of (lat, lon) tuples
+            np.ndarray: Array of shape (N, 2) with (lat, lon) rows
         """
+        if NUMBA_AVAILABLE:
+            buf = np.frombuffer(polyline_str.encode('ascii'), dtype=np.uint8)
+            scaled = _decode_polyline_kernel(buf)
+            return scaled / 1e5
+        
+        if polyline_codec is not None:
+            return np.array(polyline_codec.decode(polyline_str), dtype=float).reshape(-1, 2)
+        
+        return self._decode_polyline_pyfallback(polyline_str)
+    
+    def _decode_polyline_pyfallback(self, polyline_str):
+        """Pure-Python polyline decoder used when no accelerated decoder is installed"""
+        # Index raw bytes: each access yields an int directly, no per-char ord()
+        buf = polyline_str.encode('ascii')
+        n = len(buf)
         coordinates = []
+        append = coordinates.append
         index = 0
         lat = 0
         lng = 0
         
-        while index < len(polyline_str):
-            b = 0
+        while index < n:
             shift = 0
             result = 0
             
             while True:
-                b = ord(polyline_str[index]) - 63
+                b = buf[index] - 63
                 index += 1
                 result |= (b & 0x1f) << shift
                 shift += 5
                 if b < 0x20:
                     break
             
-            dlat = ~(result >> 1) if result & 1 else result >> 1
-            lat += dlat
+            lat += ~(result >> 1) if result & 1 else result >> 1
             
             shift = 0
             result = 0
             
             while True:
-                b = ord(polyline_str[index]) - 63
+                b = buf[index] - 63
                 index += 1
                 result |= (b & 0x1f) << shift
                 shift += 5
                 if b < 0x20:
                     break
             
-            dlng = ~(result >> 1) if result & 1 else result >> 1
-            lng += dlng
+            lng += ~(result >> 1) if result & 1 else result >> 1
             
-            coordinates.append((lat / 1e5, lng / 1e5))
+            append((lat / 1e5, lng / 1e5))
         
-        return coordinates
+        return np.array(coordinates, dtype=float).reshape(-1, 2)
     
     def _extract_steps(self, steps):
         """Extract turn-by-turn directions from Google Maps steps"""
-        directions = []
-        
-        for step in steps:
-            direction = {
-                'instruction': step.get('html_instructions', '').replace('<b>', '').replace('</b>', ''),
+        return [
+            {
+                'instruction': _HTML_TAG_RE.sub('', _HTML_DIV_RE.sub(' ', step.get('html_instructions', ''))),
                 'distance': step['distance']['value'] / 1000,  # km
                 'duration': step['duration']['value'] / 60  # minutes
             }
-            directions.append(direction)
-        
-        return directions
+            for step in steps
+        ]
     
     def _extract_openroute_steps(self, segments):
         """Extract turn-by-turn directions from OpenRouteService segments"""
@@ -368,8 +870,21 @@ class RoutingAPI:
             num_alternatives: Number of alternative routes to return
         
         Returns:
-            list: List of route dictionaries
+            list: List of RouteResult objects
         """
+        # Real alternatives come back from a single API request
+        api_routes = None
+        if self.enabled and self.service == 'google':
+            api_routes = self._get_google_route(start_coords, end_coords, 'driving', 'time', return_all_alternates=True)
+        elif self.enabled and self.service == 'openroute':
+            api_routes = self._get_openroute_route(start_coords, end_coords, 'driving', num_alternatives)
+        
+        if api_routes and not api_routes[0].get('simulated'):
+            api_routes = api_routes[:num_alternatives]
+            for i, alt_route in enumerate(api_routes[1:], start=1):
+                alt_route['route_name'] = f"Alternative {i}"
+            return api_routes
+        
         routes = []
         
         # Get primary route
@@ -379,12 +894,34 @@ class RoutingAPI:
         
         # For simulation, generate alternatives with slight variations
         if primary_route and primary_route.get('simulated'):
+            num_waypoints = len(primary_route['coordinates']) - 1
+            
             for i in range(1, num_alternatives):
-                alt_route = primary_route.copy()
                 # Vary distance and duration slightly
-                alt_route['distance'] *= (1 + (i * 0.1))
-                alt_route['duration'] *= (1 + (i * 0.15))
-                alt_route['route_name'] = f"Alternative {i}"
+                distance = primary_route['distance'] * (1 + (i * 0.1))
+                duration = primary_route['duration'] * (1 + (i * 0.15))
+                
+                # Each alternate gets its own path (no aliasing of the primary's
+                # coordinates), with reproducible jitter per alternate
+                alt_route = RouteResult(
+                    distance=distance,
+                    duration=duration,
+                    duration_in_traffic=duration * 1.2,
+                    coordinates=self._interpolate_path(
+                        start_coords, end_coords, num_waypoints + i * 5,
+                        rng=np.random.default_rng(seed=i)
+                    ),
+                    steps=[
+                        {
+                            'instruction': 'Head to emergency location',
+                            'distance': distance,
+                            'duration': duration
+                        }
+                    ],
+                    service='simulated',
+                    simulated=True,
+                    route_name=f"Alternative {i}"
+                )
                 routes.append(alt_route)
         
         return routes
@@ -394,7 +931,7 @@ class RoutingAPI:
         Calculate estimated time of arrival
         
         Args:
-            route_data: Route dictionary from get_optimal_route
+            route_data: RouteResult (or route dict) from get_optimal_route
             current_time: Starting time (defaults to now)
         
         Returns:
@@ -417,29 +954,18 @@ class RoutingAPI:
             'distance_km': route_data.get('distance', 0)
         }
     
-    def find_nearest_responder(self, emergency_coords, responder_locations):
-        """
-        Find the nearest emergency responder to an emergency location
-        
-        Args:
-            emergency_coords: Emergency location (lat, lon)
-            responder_locations: List of responder coordinates
-        
-        Returns:
-            dict: Nearest responder info with route
-        """
+    def _select_nearest(self, responder_locations, routes, candidate_ids):
+        """Pick the candidate responder whose route has the shortest distance"""
         nearest = None
         min_distance = float('inf')
         best_route = None
         
-        for i, responder_coords in enumerate(responder_locations):
-            route = self.get_optimal_route(responder_coords, emergency_coords)
-            
+        for i, route in zip(candidate_ids, routes):
             if route and route['distance'] < min_distance:
                 min_distance = route['distance']
                 nearest = {
                     'responder_id': i,
-                    'coordinates': responder_coords,
+                    'coordinates': responder_locations[i],
                     'distance': route['distance'],
                     'duration': route['duration']
                 }
@@ -450,6 +976,175 @@ class RoutingAPI:
             nearest['eta'] = self.calculate_eta(best_route)
         
         return nearest
+    
+    def _rank_responders(self, emergency_coords, responder_locations, top_k):
+        """
+        Pre-rank responders by straight-line distance to the emergency
+        
+        Road distance is strongly correlated with great-circle distance, so only
+        the closest candidates need a routing request.
+        
+        Returns:
+            list: Indices of the top_k closest responders (all if top_k is None)
+        """
+        if len(responder_locations) == 0:
+            return []
+        
+        distances = self._haversine_bulk(emergency_coords, responder_locations)
+        order = np.argsort(distances, kind='stable')
+        
+        if top_k is not None:
+            order = order[:top_k]
+        
+        return order.tolist()
+    
+    def _ors_matrix(self, sources, destinations, mode='driving', metrics=('distance', 'duration')):
+        """
+        Get a sources x destinations cost matrix from OpenRouteService in one request
+        
+        Args:
+            sources: List of (latitude, longitude) origins
+            destinations: List of (latitude, longitude) destinations
+            mode: Transportation mode ('driving', 'walking', 'bicycling')
+            metrics: Matrix metrics to request ('distance', 'duration')
+        
+        Returns:
+            dict: Matrix payload with 'distances'/'durations' lists, or None on failure
+        """
+        try:
+            url = f"{self.base_url}/v2/matrix/{self._openroute_profile(mode)}"
+            headers = self._ors_headers
+            
+            num_sources = len(sources)
+            body = {
+                # ORS uses [lon, lat]
+                'locations': [[lon, lat] for lat, lon in sources] + [[lon, lat] for lat, lon in destinations],
+                'sources': list(range(num_sources)),
+                'destinations': list(range(num_sources, num_sources + len(destinations))),
+                'metrics': list(metrics)
+            }
+            
+            response = self._session.post(url, data=_json_dumps(body), headers=headers, timeout=15)
+            
+            if response.status_code == 200:
+                return _json_loads(response.content)
+            else:
+                print(f"OpenRoute matrix API error: {response.status_code}")
+                return None
+                
+        except Exception as e:
+            print(f"Error fetching OpenRoute matrix: {e}")
+            return None
+    
+    def _find_nearest_via_matrix(self, emergency_coords, responder_locations):
+        """
+        Pick the fastest responder from a single ORS matrix request, then fetch
+        the full route (geometry and steps) for that responder only
+        
+        Returns:
+            dict: Nearest responder info with route, or None if the matrix failed
+        """
+        if len(responder_locations) == 0:
+            return None
+        
+        matrix = self._ors_matrix(responder_locations, [emergency_coords])
+        if not matrix or 'durations' not in matrix:
+            return None
+        
+        # Unroutable pairs come back as null, which becomes NaN here
+        durations = np.array(matrix['durations'], dtype=float)[:, 0]
+        if np.all(np.isnan(durations)):
+            return None
+        
+        best = int(np.nanargmin(durations))
+        route = self.get_optimal_route(responder_locations[best], emergency_coords)
+        return self._select_nearest(responder_locations, [route], [best])
+    
+    async def get_route_summary_async(self, start_coords, end_coords):
+        """
+        Get distance and duration for one route, batching concurrent callers
+        
+        With OpenRouteService, lookups awaited concurrently (e.g. many incidents in
+        a dispatch server) are coalesced into a single matrix request. Matrix
+        results carry no geometry, so use get_optimal_route when the path is needed.
+        
+        Args:
+            start_coords: Tuple of (latitude, longitude) for start point
+            end_coords: Tuple of (latitude, longitude) for end point
+        
+        Returns:
+            RouteResult: Route summary with distance (km) and duration (minutes)
+        """
+        if self.enabled and self.service == 'openroute':
+            if self._batcher is None:
+                self._batcher = _RoutingMicroBatcher(self)
+            return await self._batcher.submit(start_coords, end_coords)
+        
+        return await asyncio.to_thread(self.get_optimal_route, start_coords, end_coords)
+    
+    async def find_nearest_responder_async(self, emergency_coords, responder_locations, top_k=3, max_concurrency=16):
+        """
+        Find the nearest emergency responder, fetching candidate routes concurrently
+        
+        Args:
+            emergency_coords: Emergency location (lat, lon)
+            responder_locations: List of responder coordinates
+            top_k: Number of closest (straight-line) responders to route (None for all)
+            max_concurrency: Maximum number of in-flight routing requests
+        
+        Returns:
+            dict: Nearest responder info with route
+        """
+        if self.enabled and self.service == 'openroute':
+            nearest = await asyncio.to_thread(self._find_nearest_via_matrix, emergency_coords, responder_locations)
+            if nearest is not None:
+                return nearest
+        
+        candidate_ids = self._rank_responders(emergency_coords, responder_locations, top_k)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def fetch(responder_coords, session):
+            async with semaphore:
+                if session is None:
+                    # aiohttp not installed: run the pooled sync client in worker threads
+                    return await asyncio.to_thread(self.get_optimal_route, responder_coords, emergency_coords)
+                return await self._get_optimal_route_async(responder_coords, emergency_coords, session)
+        
+        if aiohttp is None or not self.enabled:
+            routes = await asyncio.gather(*(fetch(responder_locations[i], None) for i in candidate_ids))
+        else:
+            # The session is bound to the running event loop, so it lives for this call only
+            async with aiohttp.ClientSession() as session:
+                routes = await asyncio.gather(*(fetch(responder_locations[i], session) for i in candidate_ids))
+        
+        return self._select_nearest(responder_locations, routes, candidate_ids)
+    
+    def find_nearest_responder(self, emergency_coords, responder_locations, top_k=3):
+        """
+        Find the nearest emergency responder to an emergency location
+        
+        Args:
+            emergency_coords: Emergency location (lat, lon)
+            responder_locations: List of responder coordinates
+            top_k: Number of closest (straight-line) responders to route (None for all)
+        
+        Returns:
+            dict: Nearest responder info with route
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.find_nearest_responder_async(emergency_coords, responder_locations, top_k))
+        
+        # Already inside an event loop (asyncio.run would fail): fall back to serial requests
+        if self.enabled and self.service == 'openroute':
+            nearest = self._find_nearest_via_matrix(emergency_coords, responder_locations)
+            if nearest is not None:
+                return nearest
+        
+        candidate_ids = self._rank_responders(emergency_coords, responder_locations, top_k)
+        routes = [self.get_optimal_route(responder_locations[i], emergency_coords) for i in candidate_ids]
+        return self._select_nearest(responder_locations, routes, candidate_ids)
 
 if __name__ == "__main__":
     # Test the Routing API
@@ -4,10 +4,117 @@ Fetches real-time weather data from OpenWeather API
 """
 
 import requests
+import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
+import bisect
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
+from functools import lru_cache
 import json
 
+# Simulated weather conditions, their probabilities and precipitation ranges (mm)
+_WEATHER_CONDITIONS = ('Clear', 'Clouds', 'Rain', 'Drizzle', 'Thunderstorm', 'Snow')
+_WEATHER_CUM_WEIGHTS = tuple(np.cumsum([0.4, 0.3, 0.15, 0.1, 0.03, 0.02]).tolist())
+_PRECIPITATION_RANGES = {
+    'Rain': (2, 15),
+    'Drizzle': (0.5, 2),
+    'Thunderstorm': (10, 30)
+}
+
+# Lower bounds and spans that scale one vector of uniform draws into: temperature
+# variation, feels-like offset, wind speed, precipitation fraction, then the
+# integer humidity, pressure, wind direction, cloudiness and visibility
+_SIM_WEATHER_LOW = np.array([-5, -2, 0, 0, 40, 1000, 0, 0, 5000], dtype=float)
+_SIM_WEATHER_SPAN = np.array([10, 4, 20, 1, 51, 26, 361, 101, 5001], dtype=float)
+
+# Lower bounds and spans of simulated air quality: AQI (integer 1-5), CO, NO2, O3,
+# PM2.5 and PM10
+_SIM_AIR_LOW = np.array([1, 200, 10, 20, 5, 10], dtype=float)
+_SIM_AIR_SPAN = np.array([5, 200, 40, 60, 30, 40], dtype=float)
+
+def _hour_bucket():
+    """Index of the current hour, used to vary simulated data over time"""
+    return int(datetime.now().timestamp()) // 3600
+
+def _location_rng(latitude, longitude, offset=0):
+    """
+    Generator seeded from a location (plus an offset such as the hour bucket)
+    
+    Coordinates outside the valid range give a negative seed, which
+    default_rng rejects; those are mapped to a distinct non-negative entropy.
+    """
+    seed = int((latitude + 90) * 1000 + (longitude + 180) * 1000) + offset
+    return np.random.default_rng(seed if seed >= 0 else [-seed, 1])
+
+@lru_cache(maxsize=2048)
+def _simulated_weather(latitude, longitude, hour_bucket):
+    """
+    Simulated weather for a location (rounded to 3 decimals) during one hour
+    
+    The generator is seeded from the arguments alone, so results are memoized;
+    callers fill in the timestamp and must copy before mutating.
+    """
+    # Use location and hour to seed the generator for consistency
+    rng = _location_rng(latitude, longitude, hour_bucket)
+    
+    # One vectorized draw covers every parameter plus the weather condition
+    draws = rng.random(len(_SIM_WEATHER_LOW) + 1)
+    values = (_SIM_WEATHER_LOW + _SIM_WEATHER_SPAN * draws[:-1]).tolist()
+    temp_variation, feels_offset, wind_speed, precip_fraction = values[:4]
+    humidity, pressure, wind_direction, cloudiness, visibility = map(int, values[4:])
+    weather_main = _WEATHER_CONDITIONS[bisect.bisect(_WEATHER_CUM_WEIGHTS, draws[-1])]
+    
+    # Base temperature varies by latitude
+    temperature = 25 - abs(latitude) * 0.4 + temp_variation
+    
+    # Precipitation based on weather type
+    low, high = _PRECIPITATION_RANGES.get(weather_main, (0, 0))
+    precipitation = low + (high - low) * precip_fraction
+    
+    return {
+        'temperature': round(temperature, 1),
+        'feels_like': round(temperature + feels_offset, 1),
+        'humidity': humidity,
+        'pressure': pressure,
+        'wind_speed': round(wind_speed, 1),
+        'wind_direction': wind_direction,
+        'cloudiness': cloudiness,
+        'precipitation': round(precipitation, 1),
+        'weather_main': weather_main,
+        'weather_description': weather_main.lower(),
+        'visibility': visibility,
+        'timestamp': None,
+        'simulated': True
+    }
+
+@lru_cache(maxsize=2048)
+def _simulated_air_quality(latitude, longitude, hour_bucket):
+    """Simulated air quality for a location (rounded to 3 decimals) during one hour"""
+    rng = _location_rng(latitude, longitude, hour_bucket)
+    
+    aqi, co, no2, o3, pm2_5, pm10 = (_SIM_AIR_LOW + _SIM_AIR_SPAN * rng.random(len(_SIM_AIR_LOW))).tolist()
+    
+    return {
+        'aqi': int(aqi),
+        'co': co,
+        'no2': no2,
+        'o3': o3,
+        'pm2_5': pm2_5,
+        'pm10': pm10,
+        'simulated': True
+    }
+
+# orjson decodes the ~40-entry forecast payload much faster than stdlib json
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 class WeatherAPI:
     """
     Weather API client for fetching real-time weather data
@@ -28,6 +135,125 @@ class WeatherAPI:
         if not self.enabled:
             print("Weather API not configured. Using simulated data.")
             print("To enable: Set OPENWEATHER_API_KEY environment variable")
+        
+        # Persistent HTTP session; all three endpoints share one host, so a single
+        # keep-alive pool avoids a TCP/TLS handshake per call.
+        self._session = requests.Session()
+        retry = Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=32,
+            max_retries=retry
+        )
+        self._session.mount('https://', adapter)
+        self._session.headers.update({
+            'Accept-Encoding': 'gzip, deflate',
+            'User-Agent': 'EmergencyResponsePredictor/1.0',
+            'Connection': 'keep-alive'
+        })
+        
+        # Bounded TTL cache of API responses keyed on coordinates rounded to
+        # 2 decimals (~1km), within which conditions are effectively identical
+        self.cache_maxsize = 1024
+        self.cache_ttl = {
+            'weather': 900,       # 15 minutes
+            'forecast': 900,
+            'air_quality': 1800   # 30 minutes
+        }
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    def close(self):
+        """Close the underlying HTTP session and release pooled connections"""
+        self._session.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _cache_key(self, kind, latitude, longitude, *extra):
+        """Build a cache key with coordinates rounded to 2 decimals"""
+        return (kind, round(latitude, 2), round(longitude, 2)) + extra
+    
+    @staticmethod
+    def _copy_cached(value):
+        """Hand out copies so callers can't mutate the cached entry"""
+        if isinstance(value, list):
+            return [dict(item) for item in value]
+        return dict(value)
+    
+    def _cache_get(self, key):
+        """
+        Return a cached API result if present and not expired
+        
+        Expired entries are kept (until evicted) so they can be revalidated with
+        a conditional request or served if the API fails.
+        """
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            
+            stored_at, value = entry[:2]
+            if time.monotonic() - stored_at > self.cache_ttl[key[0]]:
+                return None
+            
+            self._cache.move_to_end(key)
+        
+        return self._copy_cached(value)
+    
+    def _cache_put(self, key, value, headers=None):
+        """Store an API result and its validators, evicting the least recently used entry"""
+        etag = last_modified = None
+        if headers is not None:
+            etag = headers.get('ETag')
+            last_modified = headers.get('Last-Modified')
+        
+        with self._cache_lock:
+            self._cache[key] = (time.monotonic(), value, etag, last_modified)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_maxsize:
+                self._cache.popitem(last=False)
+    
+    def _conditional_headers(self, key):
+        """If-None-Match/If-Modified-Since headers for revalidating an expired entry"""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+        
+        headers = {}
+        if entry is not None:
+            if entry[2]:
+                headers['If-None-Match'] = entry[2]
+            if entry[3]:
+                headers['If-Modified-Since'] = entry[3]
+        return headers
+    
+    def _cache_revalidated(self, key):
+        """Refresh an entry after a 304 Not Modified and return its value"""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            
+            self._cache[key] = (time.monotonic(),) + entry[1:]
+            self._cache.move_to_end(key)
+        
+        return self._copy_cached(entry[1])
+    
+    def _cache_fallback(self, key):
+        """Return the last good (possibly expired) result, for when the API errors"""
+        with self._cache_lock:
+            entry = self._cache.get(key)
+        
+        return None if entry is None else self._copy_cached(entry[1])
     
     def get_current_weather(self, latitude, longitude):
         """
@@ -43,46 +269,63 @@ class WeatherAPI:
         if not self.enabled:
             return self._get_simulated_weather(latitude, longitude)
         
+        cache_key = self._cache_key('weather', latitude, longitude)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            # API endpoint for current weather
-            url = f"{self.base_url}/weather"
+            url, params = self._build_current_weather_request(latitude, longitude)
+            headers = self._conditional_headers(cache_key)
+            response = self._session.get(url, params=params, headers=headers, timeout=10)
             
-            params = {
-                'lat': latitude,
-                'lon': longitude,
-                'appid': self.api_key,
-                'units': 'metric'  # Use Celsius
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
+            if response.status_code == 304:
+                cached = self._cache_revalidated(cache_key)
+                if cached is not None:
+                    return cached
             
             if response.status_code == 200:
-                data = response.json()
-                
-                # Extract relevant weather information
-                weather_data = {
-                    'temperature': data['main']['temp'],
-                    'feels_like': data['main']['feels_like'],
-                    'humidity': data['main']['humidity'],
-                    'pressure': data['main']['pressure'],
-                    'wind_speed': data['wind']['speed'],
-                    'wind_direction': data['wind'].get('deg', 0),
-                    'cloudiness': data['clouds']['all'],
-                    'precipitation': data.get('rain', {}).get('1h', 0),  # Rain in last hour
-                    'weather_main': data['weather'][0]['main'],
-                    'weather_description': data['weather'][0]['description'],
-                    'visibility': data.get('visibility', 10000),
-                    'timestamp': datetime.fromtimestamp(data['dt']).isoformat()
-                }
+                weather_data = self._parse_current_weather(_json_loads(response.content))
                 
-                return weather_data
+                self._cache_put(cache_key, weather_data, response.headers)
+                return dict(weather_data)
             else:
                 print(f"Weather API error: {response.status_code}")
-                return self._get_simulated_weather(latitude, longitude)
+                return self._cache_fallback(cache_key) or self._get_simulated_weather(latitude, longitude)
                 
         except Exception as e:
             print(f"Error fetching weather data: {e}")
-            return self._get_simulated_weather(latitude, longitude)
+            return self._cache_fallback(cache_key) or self._get_simulated_weather(latitude, longitude)
+    
+    def _build_current_weather_request(self, latitude, longitude):
+        """Build URL and query parameters for a current weather request"""
+        url = f"{self.base_url}/weather"
+        
+        params = {
+            'lat': latitude,
+            'lon': longitude,
+            'appid': self.api_key,
+            'units': 'metric'  # Use Celsius
+        }
+        
+        return url, params
+    
+    def _parse_current_weather(self, data):
+        """Extract relevant weather information from a current weather response"""
+        return {
+            'temperature': data['main']['temp'],
+            'feels_like': data['main']['feels_like'],
+            'humidity': data['main']['humidity'],
+            'pressure': data['main']['pressure'],
+            'wind_speed': data['wind']['speed'],
+            'wind_direction': data['wind'].get('deg', 0),
+            'cloudiness': data['clouds']['all'],
+            'precipitation': data.get('rain', {}).get('1h', 0),  # Rain in last hour
+            'weather_main': data['weather'][0]['main'],
+            'weather_description': data['weather'][0]['description'],
+            'visibility': data.get('visibility', 10000),
+            'timestamp': datetime.fromtimestamp(data['dt']).isoformat()
+        }
     
     def get_forecast(self, latitude, longitude, days=5):
         """
@@ -99,6 +342,11 @@ class WeatherAPI:
         if not self.enabled:
             return self._get_simulated_forecast(latitude, longitude, days)
         
+        cache_key = self._cache_key('forecast', latitude, longitude, days)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             url = f"{self.base_url}/forecast"
             
@@ -109,14 +357,20 @@ class WeatherAPI:
                 'units': 'metric'
             }
             
-            response = requests.get(url, params=params, timeout=10)
+            headers = self._conditional_headers(cache_key)
+            response = self._session.get(url, params=params, headers=headers, timeout=10)
+            
+            if response.status_code == 304:
+                cached = self._cache_revalidated(cache_key)
+                if cached is not None:
+                    return cached
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 
-                forecast_list = []
-                for item in data['list'][:days * 8]:  # 8 forecasts per day (3-hour intervals)
-                    forecast_data = {
+                # 8 forecasts per day (3-hour intervals); only the used fields are read
+                forecast_list = [
+                    {
                         'datetime': datetime.fromtimestamp(item['dt']).isoformat(),
                         'temperature': item['main']['temp'],
                         'humidity': item['main']['humidity'],
@@ -126,16 +380,18 @@ class WeatherAPI:
                         'weather_main': item['weather'][0]['main'],
                         'weather_description': item['weather'][0]['description']
                     }
-                    forecast_list.append(forecast_data)
+                    for item in data['list'][:days * 8]
+                ]
                 
-                return forecast_list
+                self._cache_put(cache_key, forecast_list, response.headers)
+                return [dict(item) for item in forecast_list]
             else:
                 print(f"Forecast API error: {response.status_code}")
-                return self._get_simulated_forecast(latitude, longitude, days)
+                return self._cache_fallback(cache_key) or self._get_simulated_forecast(latitude, longitude, days)
                 
         except Exception as e:
             print(f"Error fetching forecast: {e}")
-            return self._get_simulated_forecast(latitude, longitude, days)
+            return self._cache_fallback(cache_key) or self._get_simulated_forecast(latitude, longitude, days)
     
     def _get_simulated_weather(self, latitude, longitude):
         """
@@ -148,83 +404,43 @@ class WeatherAPI:
         Returns:
             dict: Simulated weather data
         """
-        import random
-        import math
-        
-        # Use location to seed random for consistency
-        seed = int((latitude + 90) * 1000 + (longitude + 180) * 1000)
-        random.seed(seed + int(datetime.now().timestamp()) // 3600)
-        
-        # Base temperature varies by latitude
-        base_temp = 25 - abs(latitude) * 0.4
-        
-        # Add some randomness
-        temp_variation = random.uniform(-5, 5)
-        temperature = base_temp + temp_variation
-        
-        # Generate other weather parameters
-        weather_conditions = ['Clear', 'Clouds', 'Rain', 'Drizzle', 'Thunderstorm', 'Snow']
-        weights = [0.4, 0.3, 0.15, 0.1, 0.03, 0.02]
-        weather_main = random.choices(weather_conditions, weights=weights)[0]
-        
-        # Precipitation based on weather type
-        if weather_main == 'Rain':
-            precipitation = random.uniform(2, 15)
-        elif weather_main == 'Drizzle':
-            precipitation = random.uniform(0.5, 2)
-        elif weather_main == 'Thunderstorm':
-            precipitation = random.uniform(10, 30)
-        else:
-            precipitation = 0
-        
-        weather_data = {
-            'temperature': round(temperature, 1),
-            'feels_like': round(temperature + random.uniform(-2, 2), 1),
-            'humidity': random.randint(40, 90),
-            'pressure': random.randint(1000, 1025),
-            'wind_speed': round(random.uniform(0, 20), 1),
-            'wind_direction': random.randint(0, 360),
-            'cloudiness': random.randint(0, 100),
-            'precipitation': round(precipitation, 1),
-            'weather_main': weather_main,
-            'weather_description': weather_main.lower(),
-            'visibility': random.randint(5000, 10000),
-            'timestamp': datetime.now().isoformat(),
-            'simulated': True
-        }
+        # Values are stable per ~100m and hour, so repeat calls hit the memo
+        weather_data = dict(_simulated_weather(round(latitude, 3), round(longitude, 3), _hour_bucket()))
+        weather_data['timestamp'] = datetime.now().isoformat()
         
         return weather_data
     
     def _get_simulated_forecast(self, latitude, longitude, days):
         """Generate simulated weather forecast"""
-        forecast = []
+        n = days * 8
         
-        for i in range(days * 8):
-            hour_offset = i * 3
-            forecast_time = datetime.now().timestamp() + (hour_offset * 3600)
-            
-            # Simulate temperature variation over time
-            import random
-            seed = int((latitude + 90) * 1000 + (longitude + 180) * 1000 + i)
-            random.seed(seed)
-            
-            base_temp = 25 - abs(latitude) * 0.4
-            temp_variation = random.uniform(-5, 5)
-            
-            forecast_data = {
-                'datetime': datetime.fromtimestamp(forecast_time).isoformat(),
-                'temperature': round(base_temp + temp_variation, 1),
-                'humidity': random.randint(40, 90),
-                'pressure': random.randint(1000, 1025),
-                'wind_speed': round(random.uniform(0, 20), 1),
-                'precipitation': round(random.uniform(0, 5), 1),
-                'weather_main': random.choice(['Clear', 'Clouds', 'Rain']),
+        # One location-seeded generator drawing every 3-hour step at once
+        rng = _location_rng(latitude, longitude)
+        
+        base_temp = 25 - abs(latitude) * 0.4
+        temperatures = np.round(base_temp + rng.uniform(-5, 5, n), 1).tolist()
+        humidities = rng.integers(40, 91, n).tolist()
+        pressures = rng.integers(1000, 1026, n).tolist()
+        wind_speeds = np.round(rng.uniform(0, 20, n), 1).tolist()
+        precipitations = np.round(rng.uniform(0, 5, n), 1).tolist()
+        conditions = rng.choice(['Clear', 'Clouds', 'Rain'], n).tolist()
+        
+        now = datetime.now().timestamp()
+        
+        return [
+            {
+                'datetime': datetime.fromtimestamp(now + i * 3 * 3600).isoformat(),
+                'temperature': temperatures[i],
+                'humidity': humidities[i],
+                'pressure': pressures[i],
+                'wind_speed': wind_speeds[i],
+                'precipitation': precipitations[i],
+                'weather_main': conditions[i],
                 'weather_description': 'simulated',
                 'simulated': True
             }
-            forecast.append(forecast_data)
-        
-        return forecast
+            for i in range(n)
+        ]
     
     def get_air_quality(self, latitude, longitude):
         """
@@ -238,52 +454,64 @@ class WeatherAPI:
             dict: Air quality index and components
         """
         if not self.enabled:
-            return self._get_simulated_air_quality()
+            return self._get_simulated_air_quality(latitude, longitude)
+        
+        cache_key = self._cache_key('air_quality', latitude, longitude)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
         
         try:
-            url = f"{self.base_url}/air_pollution"
+            url, params = self._build_air_quality_request(latitude, longitude)
+            headers = self._conditional_headers(cache_key)
+            response = self._session.get(url, params=params, headers=headers, timeout=10)
             
-            params = {
-                'lat': latitude,
-                'lon': longitude,
-                'appid': self.api_key
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
+            if response.status_code == 304:
+                cached = self._cache_revalidated(cache_key)
+                if cached is not None:
+                    return cached
             
             if response.status_code == 200:
-                data = response.json()
-                
-                air_quality = {
-                    'aqi': data['list'][0]['main']['aqi'],  # 1-5 scale
-                    'co': data['list'][0]['components']['co'],
-                    'no2': data['list'][0]['components']['no2'],
-                    'o3': data['list'][0]['components']['o3'],
-                    'pm2_5': data['list'][0]['components']['pm2_5'],
-                    'pm10': data['list'][0]['components']['pm10']
-                }
+                air_quality = self._parse_air_quality(_json_loads(response.content))
                 
-                return air_quality
+                self._cache_put(cache_key, air_quality, response.headers)
+                return dict(air_quality)
             else:
-                return self._get_simulated_air_quality()
+                return self._cache_fallback(cache_key) or self._get_simulated_air_quality(latitude, longitude)
                 
         except Exception as e:
             print(f"Error fetching air quality: {e}")
-            return self._get_simulated_air_quality()
+            return self._cache_fallback(cache_key) or self._get_simulated_air_quality(latitude, longitude)
     
-    def _get_simulated_air_quality(self):
-        """Generate simulated air quality data"""
-        import random
+    def _build_air_quality_request(self, latitude, longitude):
+        """Build URL and query parameters for an air pollution request"""
+        url = f"{self.base_url}/air_pollution"
+        
+        params = {
+            'lat': latitude,
+            'lon': longitude,
+            'appid': self.api_key
+        }
+        
+        return url, params
+    
+    def _parse_air_quality(self, data):
+        """Extract air quality index and components from an air pollution response"""
+        reading = data['list'][0]
+        components = reading['components']
         
         return {
-            'aqi': random.randint(1, 5),
-            'co': random.uniform(200, 400),
-            'no2': random.uniform(10, 50),
-            'o3': random.uniform(20, 80),
-            'pm2_5': random.uniform(5, 35),
-            'pm10': random.uniform(10, 50),
-            'simulated': True
+            'aqi': reading['main']['aqi'],  # 1-5 scale
+            'co': components['co'],
+            'no2': components['no2'],
+            'o3': components['o3'],
+            'pm2_5': components['pm2_5'],
+            'pm10': components['pm10']
         }
+    
+    def _get_simulated_air_quality(self, latitude, longitude):
+        """Generate simulated air quality data, deterministic per location and hour"""
+        return dict(_simulated_air_quality(round(latitude, 3), round(longitude, 3), _hour_bucket()))
 
 if __name__ == "__main__":
     # Test the Weather API
@@ -6,83 +6,214 @@ Provides interactive visualization and prediction interface
 import streamlit as st
 import pandas as pd
 import numpy as np
-import folium
-from streamlit_folium import folium_static
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import pickle
 import os
 
 from models.predictor import EmergencyPredictor
 from api.weather_api import WeatherAPI
 from api.routing_api import RoutingAPI
 
-def load_model():
-    """Load the trained emergency prediction model"""
-    model_path = 'models/emergency_model.pkl'
-    if os.path.exists(model_path):
-        with open(model_path, 'rb') as f:
-            return pickle.load(f)
-    else:
-        st.warning("Model not found. Please train the model first.")
+@st.cache_resource
+def get_predictor():
+    """Shared EmergencyPredictor, so the model is unpickled once per process"""
+    return EmergencyPredictor()
+
+@st.cache_resource
+def get_weather_api():
+    """Shared WeatherAPI, keeping its connection pool and cache across reruns"""
+    return WeatherAPI()
+
+@st.cache_resource
+def get_routing_api():
+    """Shared RoutingAPI, keeping its connection pool and cache across reruns"""
+    return RoutingAPI()
+
+@st.cache_resource
+def get_geocoding_api():
+    """Shared GeocodingAPI, keeping its connection pool and cache across reruns"""
+    from api.geocoding_api import GeocodingAPI
+    return GeocodingAPI()
+
+@st.cache_resource
+def get_cities_db():
+    """Shared GlobalCitiesDatabase, built once per process"""
+    from data.global_cities import GlobalCitiesDatabase
+    return GlobalCitiesDatabase()
+
+# Weather readings used as risk-model features
+RISK_WEATHER_COLUMNS = ('temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure')
+
+# Columns read by the analytics page, with narrowed dtypes
+ANALYTICS_COLUMNS = {
+    'timestamp': 'object',
+    'emergency_type': 'category',
+    'temperature': 'float32'
+}
+
+@st.cache_data
+def _convert_to_parquet(csv_path, parquet_path, csv_mtime):
+    """Convert the CSV once per modification, remembering failures too"""
+    from data.data_generator import convert_to_parquet
+    try:
+        return convert_to_parquet(csv_path, parquet_path)
+    except Exception as e:
+        print(f"Error converting {csv_path} to Parquet: {e}")
         return None
 
+def _analytics_data_path(csv_path='data/emergency_data.csv'):
+    """
+    Return the Parquet copy of the emergency data, converting the CSV if the
+    copy is missing or stale; falls back to the CSV if Parquet is unavailable
+    """
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    
+    if not os.path.exists(csv_path):
+        return parquet_path if os.path.exists(parquet_path) else None
+    
+    csv_mtime = os.path.getmtime(csv_path)
+    if os.path.exists(parquet_path) and os.path.getmtime(parquet_path) >= csv_mtime:
+        return parquet_path
+    
+    return _convert_to_parquet(csv_path, parquet_path, csv_mtime) or csv_path
+
+@st.cache_data(ttl=600)
+def _load_emergency_df(path, mtime):
+    """
+    Load the historical emergency data used by the analytics page
+    
+    mtime is only part of the cache key, so rewriting the file invalidates it.
+    """
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=list(ANALYTICS_COLUMNS))
+    
+    df = pd.read_csv(
+        path,
+        usecols=lambda column: column in ANALYTICS_COLUMNS,
+        dtype=ANALYTICS_COLUMNS
+    )
+    if 'timestamp' in df.columns:
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return df
+
+@st.cache_data(ttl=600)
+def _daily_counts(path, mtime):
+    """Number of incidents per calendar day"""
+    df = _load_emergency_df(path, mtime)
+    daily_counts = df.groupby(df['timestamp'].dt.date).size().reset_index()
+    daily_counts.columns = ['date', 'count']
+    return daily_counts
+
+@st.cache_data(ttl=600)
+def _type_counts(path, mtime):
+    """Number of incidents per emergency type"""
+    df = _load_emergency_df(path, mtime)
+    return df['emergency_type'].value_counts()
+
+@st.cache_data(ttl=600)
+def _heatmap_pivot(path, mtime):
+    """Incident counts pivoted by day of week and hour of day"""
+    df = _load_emergency_df(path, mtime)
+    day = df['timestamp'].dt.day_name().rename('day')
+    hour = df['timestamp'].dt.hour.rename('hour')
+    
+    heatmap_data = df.groupby([day, hour]).size().reset_index()
+    heatmap_data.columns = ['day', 'hour', 'count']
+    
+    return heatmap_data.pivot(index='day', columns='hour', values='count').fillna(0)
+
 def create_risk_map(predictions_df, center_lat=40.7128, center_lon=-74.0060):
     """Create an interactive map with risk zones"""
+    import folium
+    
     m = folium.Map(
         location=[center_lat, center_lon],
         zoom_start=11,
         tiles='OpenStreetMap'
     )
     
-    # Add risk zone markers
-    for idx, row in predictions_df.iterrows():
-        risk_level = row['risk_probability']
-        
-        # Determine color based on risk level
-        if risk_level >= 0.7:
-            color = 'red'
-            icon = 'exclamation-triangle'
-        elif risk_level >= 0.4:
-            color = 'orange'
-            icon = 'exclamation-circle'
-        else:
-            color = 'green'
-            icon = 'check-circle'
-        
-        # Create popup content
-        popup_html = f"""
-        <div style="width: 200px;">
-            <h4>Risk Level: {risk_level:.2%}</h4>
-            <p><b>Location:</b> ({row['latitude']:.4f}, {row['longitude']:.4f})</p>
-            <p><b>Temperature:</b> {row.get('temperature', 'N/A')}°C</p>
-            <p><b>Humidity:</b> {row.get('humidity', 'N/A')}%</p>
-        </div>
-        """
-        
-        folium.Marker(
-            location=[row['latitude'], row['longitude']],
-            popup=folium.Popup(popup_html, max_width=300),
-            icon=folium.Icon(color=color, icon=icon, prefix='fa'),
-            tooltip=f"Risk: {risk_level:.1%}"
-        ).add_to(m)
-        
-        # Add circle to represent risk zone
-        folium.Circle(
-            location=[row['latitude'], row['longitude']],
-            radius=risk_level * 500,  # Radius proportional to risk
-            color=color,
-            fill=True,
-            fillColor=color,
-            fillOpacity=0.3,
-            popup=f"Risk: {risk_level:.1%}"
-        ).add_to(m)
+    if predictions_df.empty:
+        return m
+    
+    # Determine color and icon based on risk level
+    risk = predictions_df['risk_probability']
+    levels = [risk >= 0.7, risk >= 0.4]
+    colors = np.select(levels, ['red', 'orange'], default='green').tolist()
+    icons = np.select(levels, ['exclamation-triangle', 'exclamation-circle'], default='check-circle').tolist()
+    
+    # Build popup and tooltip text for every point with column-wise string ops
+    def text_column(name):
+        if name in predictions_df:
+            return predictions_df[name].astype(str)
+        return 'N/A'
+    
+    tooltips = 'Risk: ' + risk.map('{:.1%}'.format)
+    popups = (
+        '<div style="width: 200px;"><h4>Risk Level: ' + risk.map('{:.2%}'.format) + '</h4>'
+        + '<p><b>Location:</b> (' + predictions_df['latitude'].map('{:.4f}'.format)
+        + ', ' + predictions_df['longitude'].map('{:.4f}'.format) + ')</p>'
+        + '<p><b>Temperature:</b> ' + text_column('temperature') + '°C</p>'
+        + '<p><b>Humidity:</b> ' + text_column('humidity') + '%</p></div>'
+    )
+    
+    # All points go into one FeatureCollection that folium serializes once per
+    # layer, instead of two map children per row. Explicit ids keep folium from
+    # keying its per-feature styles on the (long, unique) popup HTML.
+    features = [
+        {
+            'type': 'Feature',
+            'id': i,
+            'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+            'properties': {
+                'color': color,
+                'icon': icon,
+                'radius': risk_level * 500,  # Radius proportional to risk
+                'popup': popup_html,
+                'tooltip': tooltip
+            }
+        }
+        for i, (lat, lon, risk_level, color, icon, popup_html, tooltip) in enumerate(zip(
+            predictions_df['latitude'].tolist(),
+            predictions_df['longitude'].tolist(),
+            risk.tolist(),
+            colors,
+            icons,
+            popups.tolist(),
+            tooltips.tolist()
+        ))
+    ]
+    
+    risk_zones = {'type': 'FeatureCollection', 'features': features}
+    
+    # Circles representing each risk zone
+    folium.GeoJson(
+        risk_zones,
+        marker=folium.Circle(fill=True, fill_opacity=0.3),
+        style_function=lambda feature: {
+            'color': feature['properties']['color'],
+            'fillColor': feature['properties']['color'],
+            'radius': feature['properties']['radius']
+        },
+        popup=folium.GeoJsonPopup(fields=['tooltip'], labels=False)
+    ).add_to(m)
+    
+    # Risk markers, styled per feature through the shared Font Awesome icon
+    folium.GeoJson(
+        risk_zones,
+        marker=folium.Marker(icon=folium.Icon(prefix='fa')),
+        style_function=lambda feature: {
+            'markerColor': feature['properties']['color'],
+            'icon': feature['properties']['icon']
+        },
+        popup=folium.GeoJsonPopup(fields=['popup'], labels=False, max_width=300),
+        tooltip=folium.GeoJsonTooltip(fields=['tooltip'], labels=False)
+    ).add_to(m)
     
     return m
 
 def create_route_map(start_coords, end_coords, route_coords=None):
     """Create a map showing the optimal route"""
+    import folium
+    
     # Calculate center point
     center_lat = (start_coords[0] + end_coords[0]) / 2
     center_lon = (start_coords[1] + end_coords[1]) / 2
@@ -108,10 +239,10 @@ def create_route_map(start_coords, end_coords, route_coords=None):
         tooltip="Emergency Site"
     ).add_to(m)
     
-    # Add route if available
-    if route_coords:
+    # Add route if available (routing API returns an (N, 2) array of lat/lon rows)
+    if route_coords is not None and len(route_coords) > 0:
         folium.PolyLine(
-            locations=route_coords,
+            locations=np.asarray(route_coords).tolist(),
             color='blue',
             weight=5,
             opacity=0.7,
@@ -141,9 +272,9 @@ def run_dashboard():
     page = st.sidebar.radio("Select Page", 
                             ["Risk Prediction", "Route Optimization", "Analytics", "Model Training"])
     
-    # Initialize APIs
-    weather_api = WeatherAPI()
-    routing_api = RoutingAPI()
+    # Initialize APIs (cached across reruns)
+    weather_api = get_weather_api()
+    routing_api = get_routing_api()
     
     if page == "Risk Prediction":
         show_risk_prediction(weather_api)
@@ -158,12 +289,10 @@ def show_risk_prediction(weather_api):
     """Display risk prediction interface"""
     st.header("📍 Emergency Risk Prediction")
     
-    # Import global cities database and geocoding
+    # Load global cities database and geocoding (cached across reruns)
     try:
-        from data.global_cities import GlobalCitiesDatabase
-        from api.geocoding_api import GeocodingAPI
-        cities_db = GlobalCitiesDatabase()
-        geocoding_api = GeocodingAPI()
+        cities_db = get_cities_db()
+        geocoding_api = get_geocoding_api()
     except ImportError as e:
         st.error(f"Error loading global cities database: {e}")
         cities_db = None
@@ -268,7 +397,7 @@ def show_risk_prediction(weather_api):
                     st.json(weather_data)
                     
                     # Make prediction
-                    predictor = EmergencyPredictor()
+                    predictor = get_predictor()
                     risk_score = predictor.predict_risk(lat, lon, weather_data)
                     
                     # Display risk level
@@ -293,23 +422,23 @@ def show_risk_prediction(weather_api):
         lat_range = np.random.uniform(lat - 0.05, lat + 0.05, num_points)
         lon_range = np.random.uniform(lon - 0.05, lon + 0.05, num_points)
         
-        predictions_data = []
-        predictor = EmergencyPredictor()
+        predictor = get_predictor()
         
-        for i in range(num_points):
-            weather_data = weather_api.get_current_weather(lat_range[i], lon_range[i])
-            if weather_data:
-                risk = predictor.predict_risk(lat_range[i], lon_range[i], weather_data)
-                predictions_data.append({
-                    'latitude': lat_range[i],
-                    'longitude': lon_range[i],
-                    'risk_probability': risk,
-                    'temperature': weather_data.get('temperature', 0),
-                    'humidity': weather_data.get('humidity', 0)
-                })
+        # Weather is effectively uniform across the ~10km box, so one lookup at
+        # the centre (usually already cached) serves every point
+        weather_data = weather_api.get_current_weather(lat, lon)
         
-        if predictions_data:
-            predictions_df = pd.DataFrame(predictions_data)
+        if weather_data:
+            # Score all points with a single model call
+            predictions_df = pd.DataFrame({
+                'latitude': lat_range,
+                'longitude': lon_range,
+                **{column: weather_data[column] for column in RISK_WEATHER_COLUMNS if column in weather_data}
+            })
+            predictions_df['risk_probability'] = predictor.predict_risk_batch(predictions_df)
+            
+            from streamlit_folium import folium_static
+            
             risk_map = create_risk_map(predictions_df, lat, lon)
             folium_static(risk_map, width=600, height=500)
         else:
@@ -332,6 +461,8 @@ def show_route_optimization(routing_api):
         end_lon = st.number_input("End Longitude", value=-74.0060, format="%.4f", key="end_lon")
     
     if st.button("Calculate Optimal Route"):
+        from streamlit_folium import folium_static
+        
         with st.spinner("Calculating fastest route..."):
             route_data = routing_api.get_optimal_route(
                 (start_lat, start_lon),
@@ -364,19 +495,20 @@ def show_route_optimization(routing_api):
 
 def show_analytics():
     """Display analytics and historical data"""
+    import plotly.express as px
+    
     st.header("📊 Emergency Analytics Dashboard")
     
     # Load sample historical data
-    data_path = 'data/emergency_data.csv'
-    if os.path.exists(data_path):
-        df = pd.read_csv(data_path)
+    data_path = _analytics_data_path()
+    if data_path:
+        data_mtime = os.path.getmtime(data_path)
+        df = _load_emergency_df(data_path, data_mtime)
         
         # Time series analysis
         st.subheader("Emergency Trends Over Time")
         if 'timestamp' in df.columns:
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
-            daily_counts = df.groupby(df['timestamp'].dt.date).size().reset_index()
-            daily_counts.columns = ['date', 'count']
+            daily_counts = _daily_counts(data_path, data_mtime)
             
             fig = px.line(daily_counts, x='date', y='count', 
                          title='Daily Emergency Incidents',
@@ -389,7 +521,7 @@ def show_analytics():
         with col1:
             st.subheader("Emergency Type Distribution")
             if 'emergency_type' in df.columns:
-                type_counts = df['emergency_type'].value_counts()
+                type_counts = _type_counts(data_path, data_mtime)
                 fig = px.pie(values=type_counts.values, names=type_counts.index,
                            title='Emergency Types')
                 st.plotly_chart(fig, use_container_width=True)
@@ -405,13 +537,7 @@ def show_analytics():
         # Heatmap of incidents by hour and day
         st.subheader("Incident Heatmap")
         if 'timestamp' in df.columns:
-            df['hour'] = df['timestamp'].dt.hour
-            df['day'] = df['timestamp'].dt.day_name()
-            
-            heatmap_data = df.groupby(['day', 'hour']).size().reset_index()
-            heatmap_data.columns = ['day', 'hour', 'count']
-            
-            pivot_data = heatmap_data.pivot(index='day', columns='hour', values='count').fillna(0)
+            pivot_data = _heatmap_pivot(data_path, data_mtime)
             
             fig = px.imshow(pivot_data, 
                           labels=dict(x="Hour of Day", y="Day of Week", color="Incidents"),
@@ -447,11 +573,11 @@ def show_model_training():
             st.warning("⚠ No trained model found")
     
     if st.button("Generate Sample Data"):
-        from data.data_generator import generate_sample_data
+        from data.data_generator import generate_sample_data, latest_data_path
         with st.spinner("Generating sample emergency data..."):
             generate_sample_data(num_samples=1000)
             st.success("✓ Sample data generated successfully!")
-            st.info("Data saved to data/emergency_data.csv")
+            st.info(f"Data saved to {latest_data_path()}")
     
     if st.button("Train Model"):
         from models.train_model import train_emergency_model
@@ -464,6 +590,9 @@ def show_model_training():
             )
             
             if results:
+                # Drop cached models so predictions pick up the new one
+                get_predictor.clear()
+                
                 st.success("✓ Model trained successfully!")
                 
                 # Display metrics
@@ -481,6 +610,8 @@ def show_model_training():
                 
                 # Feature importance
                 if 'feature_importance' in results:
+                    import plotly.express as px
+                    
                     st.subheader("Feature Importance")
                     importance_df = pd.DataFrame({
                         'Feature': results['feature_names'],
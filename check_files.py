@@ -2,9 +2,31 @@
 Check if all required files exist and are in the correct locations
 """
 
-from pathlib import Path
 import os
 
+# Folders whose contents are checked alongside the project root
+PROJECT_DIRS = ('app', 'models', 'api', 'data')
+
+def _scan_project(root='.'):
+    """
+    List the project root and its package folders in one pass
+    
+    Entries are only stat'ed when a caller asks for their size, and DirEntry
+    caches that result, so each required file costs at most one stat call.
+    
+    Returns:
+        dict: Relative path ('api/weather_api.py' style) -> os.DirEntry
+    """
+    found = {}
+    with os.scandir(root) as entries:
+        for entry in entries:
+            found[entry.name] = entry
+            if entry.name in PROJECT_DIRS and entry.is_dir():
+                with os.scandir(entry.path) as sub_entries:
+                    for sub in sub_entries:
+                        found[f"{entry.name}/{sub.name}"] = sub
+    return found
+
 def check_files():
     """Check all required files"""
     
@@ -38,14 +60,15 @@ def check_files():
     
     all_present = True
     missing_files = []
+    entries = _scan_project()
     
     for category, files in required_files.items():
         print(f"\n{category}")
         print("-"*60)
         for file_path in files:
-            path = Path(file_path)
-            if path.exists():
-                size = path.stat().st_size
+            entry = entries.get(file_path)
+            if entry is not None:
+                size = entry.stat(follow_symlinks=False).st_size
                 print(f"  ✓ {file_path} ({size} bytes)")
             else:
                 print(f"  ❌ MISSING: {file_path}")
@@ -79,7 +102,7 @@ def check_files():
     print("Checking for misplaced files...")
     print("="*60)
     
-    root_files = [f for f in os.listdir('.') if f.endswith('.py') and f not in ['main.py', 'setup.py', 'fix_project_structure.py', 'fix_init_files.py', 'check_files.py', 'create_missing_files.py']]
+    root_files = [f for f in entries if '/' not in f and f.endswith('.py') and f not in ['main.py', 'setup.py', 'fix_project_structure.py', 'fix_init_files.py', 'check_files.py', 'create_missing_files.py']]
     
     if root_files:
         print("\n⚠ Found Python files in root that should be in folders:")
@@ -6,43 +6,159 @@ Generates synthetic emergency data for training and testing
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
 import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 
-def generate_sample_data(num_samples=1000, output_path='data/emergency_data.csv'):
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Rows generated and written per chunk; bounds peak memory for large datasets
+CHUNK_SIZE = 100_000
+
+# Below this many chunks, worker start-up costs more than it saves
+MIN_PARALLEL_CHUNKS = 4
+
+# Output directories already created or verified by this process
+_ensured_dirs = set()
+
+# Define city centers (major US cities)
+CITY_CENTERS = {
+    'New York': (40.7128, -74.0060),
+    'Los Angeles': (34.0522, -118.2437),
+    'Chicago': (41.8781, -87.6298),
+    'Houston': (29.7604, -95.3698),
+    'Phoenix': (33.4484, -112.0740),
+    'Philadelphia': (39.9526, -75.1652),
+    'San Antonio': (29.4241, -98.4936),
+    'San Diego': (32.7157, -117.1611),
+    'Dallas': (32.7767, -96.7970),
+    'San Jose': (37.3382, -121.8863)
+}
+
+# Precipitation gamma parameters by month (index month - 1): heavier rain
+# in spring/summer (Apr-Jul), winter precipitation (Nov-Feb), light otherwise
+_PRECIP_SHAPE = np.array([1, 1, 0.5, 1.5, 1.5, 1.5, 1.5, 0.5, 0.5, 0.5, 1, 1])
+_PRECIP_SCALE = np.array([3, 3, 1, 2, 2, 2, 2, 1, 1, 1, 3, 3])
+
+# Traffic density bounds indexed [weekday, hour]: weekends are flat, weekdays
+# peak at rush hour (7-8, 17-18), with shoulders (6, 9, 16, 19) and a daytime plateau
+_TRAFFIC_LOW = np.array([
+    [20] * 24,
+    [10] * 6 + [50, 70, 70, 50] + [40] * 6 + [50, 70, 70, 50] + [10] * 4
+])
+_TRAFFIC_HIGH = np.array([
+    [50] * 24,
+    [30] * 6 + [80, 100, 100, 80] + [70] * 6 + [80, 100, 100, 80] + [30] * 4
+])
+
+# City lookup arrays, gathered by a per-row integer index
+_CITY_NAMES = np.array(list(CITY_CENTERS), dtype=object)
+_CITY_LATS = np.fromiter((lat for lat, _ in CITY_CENTERS.values()), dtype=np.float64)
+_CITY_LONS = np.fromiter((lon for _, lon in CITY_CENTERS.values()), dtype=np.float64)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _emergency_prob_kernel(temperature, humidity, wind_speed, precipitation,
+                               hour, weekday, traffic_density, population_density):
+        """Fused single-pass version of the emergency probability in _emergency_probability"""
+        n = temperature.shape[0]
+        out = np.empty(n, dtype=np.float64)
+        
+        for i in prange(n):
+            prob = 0.3
+            
+            # Weather factors
+            if temperature[i] < 0 or temperature[i] > 35:
+                prob += 0.15
+            if humidity[i] > 80:
+                prob += 0.08
+            if wind_speed[i] > 15:
+                prob += 0.12
+            if precipitation[i] > 10:
+                prob += 0.15
+            
+            # Time factors
+            h = hour[i]
+            if h == 7 or h == 8 or h == 17 or h == 18:
+                prob += 0.1
+            if h >= 22 or h <= 4:
+                prob += 0.08
+            if not weekday[i]:
+                prob += 0.05
+            
+            # Traffic and population density factors
+            if traffic_density[i] > 70:
+                prob += 0.1
+            prob += population_density[i] / 1000
+            
+            out[i] = min(0.85, prob)
+        
+        return out
+
+def _emergency_probability(temperature, humidity, wind_speed, precipitation,
+                           hour, weekday, traffic_density, population_density):
     """
-    Generate synthetic emergency incident data
+    Probability of an emergency for each row
+    
+    Higher probability with:
+    - Extreme weather
+    - High traffic
+    - Rush hours
+    - Weekend nights
+    
+    Runs as one fused loop when numba is installed; the NumPy path below
+    produces identical values.
+    """
+    if NUMBA_AVAILABLE:
+        return _emergency_prob_kernel(temperature, humidity, wind_speed, precipitation,
+                                      hour, weekday, traffic_density, population_density)
+    
+    emergency_prob = np.full(len(temperature), 0.3)  # Base probability
+    
+    # Weather factors
+    emergency_prob += 0.15 * ((temperature < 0) | (temperature > 35))
+    emergency_prob += 0.08 * (humidity > 80)
+    emergency_prob += 0.12 * (wind_speed > 15)
+    emergency_prob += 0.15 * (precipitation > 10)
+    
+    # Time factors
+    emergency_prob += 0.1 * np.isin(hour, [7, 8, 17, 18])  # Rush hour
+    emergency_prob += 0.08 * ((hour >= 22) | (hour <= 4))  # Late night
+    emergency_prob += 0.05 * ~weekday  # Weekend
+    
+    # Traffic factor
+    emergency_prob += 0.1 * (traffic_density > 70)
+    
+    # Population density factor
+    emergency_prob += population_density / 1000
+    
+    # Cap probability
+    return np.minimum(0.85, emergency_prob)
+
+def _generate_chunk(n, rng, start_date):
+    """
+    Generate one chunk of synthetic emergency incident data
     
     Args:
-        num_samples: Number of data samples to generate
-        output_path: Path to save the CSV file
+        n: Number of rows in the chunk
+        rng: numpy Generator to draw from
+        start_date: Earliest possible incident timestamp
     
     Returns:
         DataFrame: Generated emergency data
     """
-    print(f"Generating {num_samples} emergency data samples...")
-    
-    # Ensure output directory exists
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    
-    # Set random seed for reproducibility
-    np.random.seed(42)
-    random.seed(42)
-    
-    # Define city centers (major US cities)
-    city_centers = {
-        'New York': (40.7128, -74.0060),
-        'Los Angeles': (34.0522, -118.2437),
-        'Chicago': (41.8781, -87.6298),
-        'Houston': (29.7604, -95.3698),
-        'Phoenix': (33.4484, -112.0740),
-        'Philadelphia': (39.9526, -75.1652),
-        'San Antonio': (29.4241, -98.4936),
-        'San Diego': (32.7157, -117.1611),
-        'Dallas': (32.7767, -96.7970),
-        'San Jose': (37.3382, -121.8863)
-    }
-    
     # Emergency types and their base probabilities
     emergency_types = {
         'Traffic Accident': 0.35,
@@ -54,219 +170,297 @@ def generate_sample_data(num_samples=1000, output_path='data/emergency_data.csv'
         'Other': 0.07
     }
     
-    data = []
+    # Random timestamp within the past year, drawn as minute offsets and kept
+    # as datetime64 (whole seconds) rather than formatted to strings per row
+    minute_offsets = rng.integers(0, 366 * 24 * 60, n)
+    timestamps = pd.Timestamp(start_date).floor('s') + pd.to_timedelta(minute_offsets, unit='m')
+    
+    # Select random city
+    city_idx = rng.integers(0, len(_CITY_NAMES), n)
+    
+    # Add randomness to location (within ~10km radius)
+    lat_offset = rng.normal(0, 0.05, n)
+    lon_offset = rng.normal(0, 0.05, n)
+    latitude = _CITY_LATS[city_idx] + lat_offset
+    longitude = _CITY_LONS[city_idx] + lon_offset
+    
+    # Extract time features
+    hour = timestamps.hour.to_numpy()
+    day_of_week = timestamps.dayofweek.to_numpy()
+    month = timestamps.month.to_numpy()
+    weekday = day_of_week < 5
+    
+    # Generate weather data
+    # Base temperature varies by location latitude and season
+    base_temp = 15 + (40 - np.abs(latitude)) * 0.5
+    seasonal_var = 10 * np.sin((month - 1) * np.pi / 6)
+    temperature = base_temp + seasonal_var + rng.normal(0, 5, n)
+    
+    humidity = np.clip(rng.normal(60, 15, n), 20, 100)
+    wind_speed = rng.gamma(2, 3, n)
+    
+    # Precipitation (higher in certain months)
+    precipitation = rng.gamma(_PRECIP_SHAPE[month - 1], _PRECIP_SCALE[month - 1])
+    
+    pressure = rng.normal(1013, 10, n)
+    
+    # Traffic density (higher during rush hours and weekdays)
+    traffic_density = rng.uniform(_TRAFFIC_LOW[weekday.view(np.int8), hour],
+                                  _TRAFFIC_HIGH[weekday.view(np.int8), hour])
+    
+    # Population density (based on distance from city center)
+    distance_from_center = np.hypot(lat_offset, lon_offset)
+    population_density = np.maximum(0, 100 - (distance_from_center * 500))
+    
+    emergency_prob = _emergency_probability(temperature, humidity, wind_speed, precipitation,
+                                            hour, weekday, traffic_density, population_density)
+    
+    # Determine if emergency occurred
+    emergency_occurred = (rng.random(n) < emergency_prob).astype(int)
+    occurred = emergency_occurred == 1
+    
+    # If emergency occurred, select type
+    type_names = list(emergency_types.keys())
+    flood, traffic, fire, collapse = (type_names.index(name) for name in
+                                      ('Flood', 'Traffic Accident', 'Fire', 'Building Collapse'))
+    
+    # Adjust probabilities based on conditions, one row per sample
+    type_probs = np.tile(np.array(list(emergency_types.values())), (n, 1))
+    heavy_rain = precipitation > 10
+    high_wind = wind_speed > 15
+    type_probs[heavy_rain, flood] *= 3
+    type_probs[heavy_rain, traffic] *= 1.5
+    type_probs[high_wind, fire] *= 0.5
+    type_probs[high_wind, collapse] *= 2
+    type_probs[traffic_density > 70, traffic] *= 2
+    
+    # Normalize probabilities and sample by inverse CDF
+    type_cdf = np.cumsum(type_probs, axis=1)
+    type_cdf /= type_cdf[:, -1:]
+    type_idx = (rng.random((n, 1)) < type_cdf).argmax(axis=1)
+    emergency_type = pd.Categorical.from_codes(np.where(occurred, type_idx, -1), categories=type_names)
+    
+    # Severity (1-5 scale, only if emergency occurred)
+    # More severe in extreme conditions
+    extreme = (precipitation > 15) | (wind_speed > 20) | (temperature < -5) | (temperature > 40)
+    severity = np.minimum(5, rng.integers(1, 6, n) + extreme)
+    severity = np.where(occurred, severity, np.nan)
+    
+    # Response time (minutes, only if emergency occurred)
+    # Faster in high-density areas, slower in bad weather
+    response_time = rng.gamma(3, 2, n)  # Mean ~6 minutes
+    response_time *= np.where(population_density < 30, 1.5, 1.0)
+    response_time *= np.where(precipitation > 10, 1.3, 1.0)
+    response_time *= np.where(traffic_density > 70, 1.4, 1.0)
+    response_time = np.where(occurred, np.round(response_time, 1), np.nan)
+    
+    # Create DataFrame from the column arrays. Readings carry one decimal, so
+    # float32 is plenty; coordinates keep float64 for their 6 decimals.
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'city': pd.Categorical.from_codes(city_idx, categories=_CITY_NAMES),
+        'latitude': np.round(latitude, 6),
+        'longitude': np.round(longitude, 6),
+        'hour': hour.astype(np.int8),
+        'day_of_week': day_of_week.astype(np.int8),
+        'month': month.astype(np.int8),
+        'temperature': np.round(temperature, 1).astype(np.float32),
+        'humidity': np.round(humidity, 1).astype(np.float32),
+        'wind_speed': np.round(wind_speed, 1).astype(np.float32),
+        'precipitation': np.round(precipitation, 1).astype(np.float32),
+        'pressure': np.round(pressure, 1).astype(np.float32),
+        'traffic_density': np.round(traffic_density, 1).astype(np.float32),
+        'population_density': np.round(population_density, 1).astype(np.float32),
+        'emergency_occurred': emergency_occurred.astype(np.uint8),
+        'emergency_type': emergency_type,
+        'severity': severity.astype(np.float32),
+        'response_time': response_time.astype(np.float32)
+    })
+
+def _iter_chunks(chunk_sizes, rngs, start_date, max_workers):
+    """
+    Yield generated chunks in order, generating ahead in worker processes
+    
+    At most two chunks per worker are in flight, so memory stays bounded
+    while the caller writes earlier chunks. Workers are spawned rather than
+    forked: forking after numba or pyarrow have started their thread pools
+    can deadlock the children.
+    """
+    if max_workers <= 1 or len(chunk_sizes) < MIN_PARALLEL_CHUNKS:
+        for n, rng in zip(chunk_sizes, rngs):
+            yield _generate_chunk(n, rng, start_date)
+        return
+    
+    mp_context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as executor:
+        pending = deque()
+        for n, rng in zip(chunk_sizes, rngs):
+            pending.append(executor.submit(_generate_chunk, n, rng, start_date))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def latest_data_path(csv_path='data/emergency_data.csv'):
+    """
+    Return whichever of the CSV and its Parquet sibling was written last
+    
+    Args:
+        csv_path: Path to the CSV copy of the emergency data
+    
+    Returns:
+        str: Path to the freshest existing copy, or csv_path if neither exists
+    """
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    if not os.path.exists(parquet_path):
+        return csv_path
+    if os.path.exists(csv_path) and os.path.getmtime(csv_path) > os.path.getmtime(parquet_path):
+        return csv_path
+    return parquet_path
+
+def generate_sample_data(num_samples=1000, output_path='data/emergency_data.csv',
+                         chunk_size=CHUNK_SIZE, return_df=True, file_format='parquet',
+                         max_workers=None):
+    """
+    Generate synthetic emergency incident data
+    
+    Rows are generated and written one chunk at a time (one Parquet row group
+    or CSV append per chunk), so peak memory is bounded by chunk_size unless
+    the full DataFrame is requested. Datasets spanning several chunks are
+    generated in parallel worker processes.
+    
+    Args:
+        num_samples: Number of data samples to generate
+        output_path: Path to save the data; the extension follows file_format
+        chunk_size: Number of rows generated and written per chunk
+        return_df: Whether to keep and return the full DataFrame
+        file_format: 'parquet' (zstd-compressed, needs pyarrow) or 'csv'
+        max_workers: Worker processes for multi-chunk runs (defaults to CPU count)
+    
+    Returns:
+        DataFrame: Generated emergency data (None if return_df is False)
+    """
+    print(f"Generating {num_samples} emergency data samples...")
+    
+    if file_format == 'parquet' and not PYARROW_AVAILABLE:
+        print("pyarrow not installed. Writing CSV instead of Parquet.")
+        file_format = 'csv'
+    output_path = os.path.splitext(output_path)[0] + '.' + file_format
+    
+    # Ensure output directory exists
+    output_dir = os.path.dirname(output_path)
+    if output_dir and output_dir not in _ensured_dirs:
+        os.makedirs(output_dir, exist_ok=True)
+        _ensured_dirs.add(output_dir)
     
     # Generate data for the past year
     end_date = datetime.now()
     start_date = end_date - timedelta(days=365)
     
-    for i in range(num_samples):
-        # Random timestamp within the past year
-        random_days = random.randint(0, 365)
-        random_hours = random.randint(0, 23)
-        random_minutes = random.randint(0, 59)
-        timestamp = start_date + timedelta(days=random_days, hours=random_hours, minutes=random_minutes)
-        
-        # Select random city
-        city_name = random.choice(list(city_centers.keys()))
-        city_lat, city_lon = city_centers[city_name]
-        
-        # Add randomness to location (within ~10km radius)
-        lat_offset = np.random.normal(0, 0.05)
-        lon_offset = np.random.normal(0, 0.05)
-        latitude = city_lat + lat_offset
-        longitude = city_lon + lon_offset
-        
-        # Extract time features
-        hour = timestamp.hour
-        day_of_week = timestamp.weekday()
-        month = timestamp.month
-        
-        # Generate weather data
-        # Base temperature varies by location latitude and season
-        base_temp = 15 + (40 - abs(latitude)) * 0.5
-        seasonal_var = 10 * np.sin((month - 1) * np.pi / 6)
-        temperature = base_temp + seasonal_var + np.random.normal(0, 5)
-        
-        humidity = max(20, min(100, np.random.normal(60, 15)))
-        wind_speed = max(0, np.random.gamma(2, 3))
-        
-        # Precipitation (higher in certain months)
-        if month in [4, 5, 6, 7]:  # Spring/Summer rain
-            precipitation = max(0, np.random.gamma(1.5, 2))
-        elif month in [11, 12, 1, 2]:  # Winter precipitation
-            precipitation = max(0, np.random.gamma(1, 3))
-        else:
-            precipitation = max(0, np.random.gamma(0.5, 1))
-        
-        pressure = np.random.normal(1013, 10)
-        
-        # Traffic density (higher during rush hours and weekdays)
-        if hour in [7, 8, 17, 18] and day_of_week < 5:
-            traffic_density = np.random.uniform(70, 100)
-        elif hour in [6, 9, 16, 19] and day_of_week < 5:
-            traffic_density = np.random.uniform(50, 80)
-        elif 9 <= hour <= 17 and day_of_week < 5:
-            traffic_density = np.random.uniform(40, 70)
-        elif day_of_week >= 5:  # Weekend
-            traffic_density = np.random.uniform(20, 50)
-        else:
-            traffic_density = np.random.uniform(10, 30)
-        
-        # Population density (based on distance from city center)
-        distance_from_center = np.sqrt(lat_offset**2 + lon_offset**2)
-        population_density = max(0, 100 - (distance_from_center * 500))
-        
-        # Determine if emergency occurred
-        # Higher probability with:
-        # - Extreme weather
-        # - High traffic
-        # - Rush hours
-        # - Weekend nights
-        
-        emergency_prob = 0.3  # Base probability
-        
-        # Weather factors
-        if temperature < 0 or temperature > 35:
-            emergency_prob += 0.15
-        if humidity > 80:
-            emergency_prob += 0.08
-        if wind_speed > 15:
-            emergency_prob += 0.12
-        if precipitation > 10:
-            emergency_prob += 0.15
-        
-        # Time factors
-        if hour in [7, 8, 17, 18]:  # Rush hour
-            emergency_prob += 0.1
-        if 22 <= hour or hour <= 4:  # Late night
-            emergency_prob += 0.08
-        if day_of_week in [5, 6]:  # Weekend
-            emergency_prob += 0.05
-        
-        # Traffic factor
-        if traffic_density > 70:
-            emergency_prob += 0.1
-        
-        # Population density factor
-        emergency_prob += population_density / 1000
-        
-        # Cap probability
-        emergency_prob = min(0.85, emergency_prob)
-        
-        # Determine if emergency occurred
-        emergency_occurred = 1 if random.random() < emergency_prob else 0
-        
-        # If emergency occurred, select type
-        if emergency_occurred:
-            # Adjust probabilities based on conditions
-            type_probs = emergency_types.copy()
-            
-            if precipitation > 10:
-                type_probs['Flood'] *= 3
-                type_probs['Traffic Accident'] *= 1.5
-            if wind_speed > 15:
-                type_probs['Fire'] *= 0.5
-                type_probs['Building Collapse'] *= 2
-            if traffic_density > 70:
-                type_probs['Traffic Accident'] *= 2
-            
-            # Normalize probabilities
-            total_prob = sum(type_probs.values())
-            type_probs = {k: v/total_prob for k, v in type_probs.items()}
-            
-            emergency_type = random.choices(
-                list(type_probs.keys()),
-                weights=list(type_probs.values())
-            )[0]
-        else:
-            emergency_type = None
-        
-        # Severity (1-5 scale, only if emergency occurred)
-        if emergency_occurred:
-            # More severe in extreme conditions
-            base_severity = random.randint(1, 5)
-            if precipitation > 15 or wind_speed > 20 or temperature < -5 or temperature > 40:
-                base_severity = min(5, base_severity + 1)
-            severity = base_severity
-        else:
-            severity = None
-        
-        # Response time (minutes, only if emergency occurred)
-        if emergency_occurred:
-            # Faster in high-density areas, slower in bad weather
-            base_response = np.random.gamma(3, 2)  # Mean ~6 minutes
-            
-            if population_density < 30:
-                base_response *= 1.5
-            if precipitation > 10:
-                base_response *= 1.3
-            if traffic_density > 70:
-                base_response *= 1.4
+    # Seeded generator per chunk for reproducibility; spawned streams are
+    # independent, so output does not depend on the number of workers
+    chunk_sizes = [min(chunk_size, num_samples - start) for start in range(0, num_samples, chunk_size)]
+    rngs = [np.random.default_rng(seed) for seed in np.random.SeedSequence(42).spawn(len(chunk_sizes))]
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(chunk_sizes))
+    
+    # Running statistics for the summary, so chunks need not be kept
+    chunks = []
+    total = 0
+    type_counts = pd.Series(dtype='int64')
+    writer = None
+    
+    try:
+        for chunk_num, df_chunk in enumerate(_iter_chunks(chunk_sizes, rngs, start_date, max_workers)):
+            if file_format == 'parquet':
+                table = pa.Table.from_pandas(df_chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema,
+                                              compression='zstd', compression_level=3)
+                writer.write_table(table)
+            else:
+                # First chunk truncates the file and writes the header
+                df_chunk.to_csv(output_path, mode='w' if chunk_num == 0 else 'a',
+                                header=chunk_num == 0, index=False)
             
-            response_time = round(base_response, 1)
-        else:
-            response_time = None
-        
-        # Create data record
-        record = {
-            'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-            'city': city_name,
-            'latitude': round(latitude, 6),
-            'longitude': round(longitude, 6),
-            'hour': hour,
-            'day_of_week': day_of_week,
-            'month': month,
-            'temperature': round(temperature, 1),
-            'humidity': round(humidity, 1),
-            'wind_speed': round(wind_speed, 1),
-            'precipitation': round(precipitation, 1),
-            'pressure': round(pressure, 1),
-            'traffic_density': round(traffic_density, 1),
-            'population_density': round(population_density, 1),
-            'emergency_occurred': emergency_occurred,
-            'emergency_type': emergency_type,
-            'severity': severity,
-            'response_time': response_time
-        }
-        
-        data.append(record)
-        
-        # Progress indicator
-        if (i + 1) % 100 == 0:
-            print(f"Generated {i + 1}/{num_samples} samples...")
+            total += len(df_chunk)
+            type_counts = type_counts.add(df_chunk['emergency_type'].value_counts(), fill_value=0)
+            if return_df:
+                chunks.append(df_chunk)
+    finally:
+        if writer is not None:
+            writer.close()
     
-    # Create DataFrame
-    df = pd.DataFrame(data)
+    incidents = int(type_counts.sum())
+    type_counts = type_counts[type_counts > 0].astype('int64').sort_values(ascending=False)
     
     # Display statistics
     print("\n" + "="*60)
     print("DATA GENERATION COMPLETE")
     print("="*60)
-    print(f"\nTotal samples: {len(df)}")
-    print(f"Emergency incidents: {df['emergency_occurred'].sum()} ({df['emergency_occurred'].mean()*100:.1f}%)")
-    print(f"Non-emergency samples: {(df['emergency_occurred']==0).sum()} ({(df['emergency_occurred']==0).mean()*100:.1f}%)")
+    print(f"\nTotal samples: {total}")
+    if total > 0:
+        print(f"Emergency incidents: {incidents} ({incidents/total*100:.1f}%)")
+        print(f"Non-emergency samples: {total - incidents} ({(total - incidents)/total*100:.1f}%)")
     
-    if df['emergency_occurred'].sum() > 0:
+    if incidents > 0:
         print("\nEmergency Type Distribution:")
-        type_counts = df[df['emergency_occurred']==1]['emergency_type'].value_counts()
         for etype, count in type_counts.items():
-            print(f"  {etype}: {count} ({count/df['emergency_occurred'].sum()*100:.1f}%)")
+            print(f"  {etype}: {count} ({count/incidents*100:.1f}%)")
     
     print(f"\nData saved to: {output_path}")
     print("="*60)
     
-    # Save to CSV
-    df.to_csv(output_path, index=False)
+    if not return_df:
+        return None
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+def convert_to_parquet(csv_path='data/emergency_data.csv', parquet_path=None):
+    """
+    Convert the emergency data CSV to a typed Parquet file
+    
+    Timestamps are stored as datetime64, city and emergency type as categoricals
+    and weather readings as float32, so readers skip text parsing entirely.
+    
+    Args:
+        csv_path: Path to the CSV written by generate_sample_data
+        parquet_path: Output path (defaults to csv_path with a .parquet extension)
+    
+    Returns:
+        str: Path to the Parquet file, or None if no Parquet engine is installed
+    """
+    if parquet_path is None:
+        parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
     
-    return df
+    df = pd.read_csv(
+        csv_path,
+        parse_dates=['timestamp'],
+        dtype={
+            'city': 'category',
+            'emergency_type': 'category',
+            'temperature': 'float32',
+            'humidity': 'float32'
+        }
+    )
+    
+    try:
+        df.to_parquet(parquet_path, index=False)
+    except ImportError as e:
+        print(f"Parquet conversion skipped: {e}")
+        return None
+    
+    return parquet_path
 
-def generate_realtime_test_data(num_locations=50):
+def generate_realtime_test_data(num_locations=50, rng=None):
     """
     Generate real-time test data for current conditions
     
     Args:
         num_locations: Number of test locations to generate
+        rng: numpy Generator to draw from (a fresh unseeded one by default)
     
     Returns:
         DataFrame: Current test data
@@ -274,31 +468,24 @@ def generate_realtime_test_data(num_locations=50):
     # Use current time
     current_time = datetime.now()
     
-    # Generate random locations around major cities
-    city_centers = [
-        (40.7128, -74.0060),  # NYC
-        (34.0522, -118.2437),  # LA
-        (41.8781, -87.6298)   # Chicago
-    ]
+    # Generate random locations around major cities (NYC, LA, Chicago)
+    city_lats = np.array([40.7128, 34.0522, 41.8781])
+    city_lons = np.array([-74.0060, -118.2437, -87.6298])
     
-    data = []
+    if rng is None:
+        rng = np.random.default_rng()
+    city_idx = rng.integers(0, len(city_lats), num_locations)
     
-    for i in range(num_locations):
-        city_lat, city_lon = random.choice(city_centers)
-        
-        # Random offset
-        lat = city_lat + np.random.normal(0, 0.05)
-        lon = city_lon + np.random.normal(0, 0.05)
-        
-        record = {
-            'latitude': round(lat, 6),
-            'longitude': round(lon, 6),
-            'timestamp': current_time.isoformat()
-        }
-        
-        data.append(record)
+    # Random offset
+    lats = city_lats[city_idx] + rng.normal(0, 0.05, num_locations)
+    lons = city_lons[city_idx] + rng.normal(0, 0.05, num_locations)
     
-    return pd.DataFrame(data)
+    # The scalar timestamp broadcasts to every row
+    return pd.DataFrame({
+        'latitude': lats.round(6),
+        'longitude': lons.round(6),
+        'timestamp': current_time.isoformat()
+    })
 
 if __name__ == "__main__":
     # Generate sample data
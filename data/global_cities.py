@@ -4,10 +4,52 @@ Comprehensive database of major cities worldwide with focus on African countries
 Data source: Combination of GeoNames, SimpleMaps, and manual curation
 """
 
-import pandas as pd
+import numpy as np
+import bisect
+import functools
+import math
 import json
+import unicodedata
 from pathlib import Path
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Mean Earth radius in kilometers
+EARTH_RADIUS_KM = 6371.0
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _haversine_matrix_kernel(lat1, lon1, lat2, lon2, out):
+        """Fill out[i, j] with the great-circle distance in km; inputs in radians"""
+        cos_lat2 = np.cos(lat2)
+        for i in prange(lat1.shape[0]):
+            cos_lat1 = math.cos(lat1[i])
+            for j in range(lat2.shape[0]):
+                cos_angle = (math.cos(lat2[j] - lat1[i])
+                             - cos_lat1 * cos_lat2[j] * (1.0 - math.cos(lon2[j] - lon1[i])))
+                out[i, j] = EARTH_RADIUS_KM * math.acos(min(1.0, max(-1.0, cos_angle)))
+
+def _fold(text):
+    """Lowercase text and strip accents, so 'Yaoundé' and 'yaounde' compare equal"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+def _haversine_matrix(lat1, lon1, lat2, lon2):
+    """Pairwise great-circle distances in km between two sets of points in radians"""
+    if NUMBA_AVAILABLE:
+        out = np.empty((lat1.shape[0], lat2.shape[0]), dtype=np.float64)
+        _haversine_matrix_kernel(lat1, lon1, lat2, lon2, out)
+        return out
+    
+    lat1 = lat1[:, np.newaxis]
+    lon1 = lon1[:, np.newaxis]
+    cos_angle = np.cos(lat2 - lat1) - np.cos(lat1) * np.cos(lat2) * (1 - np.cos(lon2 - lon1))
+    return EARTH_RADIUS_KM * np.arccos(np.clip(cos_angle, -1.0, 1.0))
+
 class GlobalCitiesDatabase:
     """
     Global cities database with extensive African coverage
@@ -15,12 +57,71 @@ class GlobalCitiesDatabase:
     
     def __init__(self):
         """Initialize with comprehensive city data"""
-        self.cities = self._load_global_cities()
+        self._load_global_cities()
+        self._cities_df = None
+        # Rows are stored grouped by country, so each country is one
+        # contiguous (start, stop) slice of the column arrays
+        bounds = np.searchsorted(self.country_code, np.arange(len(self.country_names) + 1)).tolist()
+        self._country_slices = {name: (bounds[code], bounds[code + 1])
+                                for code, name in enumerate(self.country_names)}
+        self._sorted_countries = sorted(self.country_names[code] for code in np.unique(self.country_code).tolist())
+        
+        # Accent-folded lowercase names, computed once so queries don't re-fold every row
+        self._city_fold = np.array([_fold(city) for city in self.city_names.tolist()], dtype=str)
+        self._country_fold = np.array([_fold(country) for country in self.country_names], dtype=str)[self.country_code]
+        
+        # Row records in table order, for exact lookups and result assembly
+        countries = [self.country_names[code] for code in self.country_code.tolist()]
+        self._records = [
+            {'city': city, 'lat': lat, 'lon': lon, 'population': population, 'country': country}
+            for city, lat, lon, population, country in zip(
+                self.city_names.tolist(), self.lat.tolist(), self.lon.tolist(),
+                self.population.tolist(), countries
+            )
+        ]
+        
+        # "city|country" lines joined into one string, so a substring query is a
+        # few str.find calls over a single buffer instead of a scan per row
+        lines = [f"{city}|{country}" for city, country in
+                 zip(self._city_fold.tolist(), self._country_fold.tolist())]
+        self._search_corpus = "\n".join(lines)
+        self._corpus_starts = []
+        offset = 0
+        for line in lines:
+            self._corpus_starts.append(offset)
+            offset += len(line) + 1
+        
+        # Coordinates in radians, plus cos(lat), for distance queries
+        self._lat_rad = np.radians(self.lat)
+        self._lon_rad = np.radians(self.lon)
+        self._cos_lat = np.cos(self._lat_rad)
+        self._tree = None
+        
+        # Folded city names in sorted order, for bisect prefix lookups
+        order = np.argsort(self._city_fold, kind='stable')
+        self._sorted_city_fold = self._city_fold[order].tolist()
+        self._sorted_city_idx = order.tolist()
+        
+        # Hash indexes for exact lookups; the first row wins on duplicates
+        self._by_country_city = {}
+        self._by_city = {}
+        for record, city_key, country_key in zip(self._records, self._city_fold.tolist(),
+                                                 self._country_fold.tolist()):
+            self._by_country_city.setdefault((country_key, city_key), record)
+            self._by_city.setdefault(city_key, record)
+        
+        # Autocomplete fires the same query on every re-render, so remember the
+        # matched rows for recent (query, limit) pairs; bound per instance so
+        # the cache goes away with the database
+        self._autocomplete_indices = functools.lru_cache(maxsize=256)(self._match_indices)
     
     def _load_global_cities(self):
         """
         Load comprehensive global cities database
         Includes major cities from all continents with special focus on Africa
+        
+        Stored column-wise: one array per field, with each city's country as
+        a uint8 code into the country_names table.
         """
         cities_data = {
             # NIGERIA - Comprehensive coverage
@@ -158,14 +259,41 @@ class GlobalCitiesDatabase:
             ],
         }
         
-        # Flatten the dictionary into a list of all cities
-        all_cities = []
-        for country, cities in cities_data.items():
-            for city in cities:
-                city['country'] = country
-                all_cities.append(city)
+        # Flatten the dictionary into column arrays
+        num_cities = sum(len(cities) for cities in cities_data.values())
+        self.country_names = tuple(cities_data)
+        self.city_names = np.empty(num_cities, dtype=object)
+        self.lat = np.empty(num_cities, dtype=np.float64)
+        self.lon = np.empty(num_cities, dtype=np.float64)
+        self.population = np.empty(num_cities, dtype=np.int64)
+        self.country_code = np.empty(num_cities, dtype=np.uint8)
         
-        return pd.DataFrame(all_cities)
+        i = 0
+        for code, cities in enumerate(cities_data.values()):
+            for city in cities:
+                self.city_names[i] = city['city']
+                self.lat[i] = city['lat']
+                self.lon[i] = city['lon']
+                self.population[i] = city['population']
+                self.country_code[i] = code
+                i += 1
+    
+    @property
+    def cities(self):
+        """DataFrame view of the database, built on first use (e.g. for export)"""
+        if self._cities_df is None:
+            # pandas is only needed here, so it stays off the import path of
+            # lookups and autocomplete
+            import pandas as pd
+            
+            self._cities_df = pd.DataFrame({
+                'city': self.city_names,
+                'lat': self.lat,
+                'lon': self.lon,
+                'population': self.population,
+                'country': pd.Categorical.from_codes(self.country_code, categories=self.country_names)
+            })
+        return self._cities_df
     
     def search_city(self, city_name, country=None):
         """
@@ -178,30 +306,31 @@ class GlobalCitiesDatabase:
         Returns:
             Dictionary with city information or None
         """
-        # Case-insensitive search
-        mask = self.cities['city'].str.lower() == city_name.lower()
-        
+        # Case- and accent-insensitive search
         if country:
-            mask = mask & (self.cities['country'].str.lower() == country.lower())
-        
-        results = self.cities[mask]
+            result = self._by_country_city.get((_fold(country), _fold(city_name)))
+        else:
+            result = self._by_city.get(_fold(city_name))
         
-        if len(results) > 0:
-            return results.iloc[0].to_dict()
-        return None
+        # Hand out a copy so callers can't mutate the index
+        return dict(result) if result is not None else None
     
     def get_all_countries(self):
         """Get list of all countries in database"""
-        return sorted(self.cities['country'].unique().tolist())
+        return list(self._sorted_countries)
     
     def get_cities_by_country(self, country):
         """Get all cities for a specific country"""
-        return self.cities[self.cities['country'] == country].to_dict('records')
+        start, stop = self._country_slices.get(country, (0, 0))
+        return [dict(record) for record in self._records[start:stop]]
     
     def get_autocomplete_options(self, query, limit=10):
         """
         Get autocomplete suggestions for city search
         
+        Cities whose name starts with the query come first (alphabetically),
+        followed by other cities whose name or country contains it.
+        
         Args:
             query: Search query
             limit: Maximum number of results
@@ -212,38 +341,147 @@ class GlobalCitiesDatabase:
         if not query or len(query) < 2:
             return []
         
-        query_lower = query.lower()
+        indices = self._autocomplete_indices(_fold(query), limit)
+        
+        return [
+            {
+                'label': f"{record['city']}, {record['country']}",
+                'city': record['city'],
+                'country': record['country'],
+                'lat': record['lat'],
+                'lon': record['lon']
+            }
+            for record in map(self._records.__getitem__, indices)
+        ]
+    
+    def _match_indices(self, query_fold, limit):
+        """Row indices matching a folded query: prefix matches, then substring matches"""
+        # Prefix matches: a contiguous slice of the sorted names
+        lo = bisect.bisect_left(self._sorted_city_fold, query_fold)
+        hi = bisect.bisect_right(self._sorted_city_fold, query_fold + '\U0010ffff')
+        indices = self._sorted_city_idx[lo:min(hi, lo + limit)]
+        
+        # Fill up with substring matches in both city and country names
+        if len(indices) < limit:
+            seen = set(indices)
+            for i in self._substring_matches(query_fold):
+                if i not in seen:
+                    indices.append(i)
+                    if len(indices) == limit:
+                        break
+        
+        return tuple(indices)
+    
+    def _substring_matches(self, query_fold):
+        """Yield, in table order, rows whose city or country contains the query"""
+        # Separators would let a match straddle two fields or rows
+        if '|' in query_fold or '\n' in query_fold:
+            return
         
-        # Search in both city and country names
-        mask = (
-            self.cities['city'].str.lower().str.contains(query_lower) |
-            self.cities['country'].str.lower().str.contains(query_lower)
+        corpus = self._search_corpus
+        starts = self._corpus_starts
+        pos = corpus.find(query_fold)
+        while pos != -1:
+            row = bisect.bisect_right(starts, pos) - 1
+            yield row
+            # Resume at the next row; one hit per row is enough
+            if row + 1 == len(starts):
+                return
+            pos = corpus.find(query_fold, starts[row + 1])
+    
+    def nearest_city(self, lat, lon, k=1):
+        """
+        Find the cities closest to a point by great-circle distance
+        
+        Args:
+            lat: Latitude in degrees
+            lon: Longitude in degrees
+            k: Number of cities to return
+        
+        Returns:
+            List of city dictionaries, nearest first, each with a 'distance_km' key
+        """
+        k = min(k, len(self.lat))
+        if k <= 0:
+            return []
+        
+        lat_r = math.radians(lat)
+        lon_r = math.radians(lon)
+        
+        # cos(central angle) = cos(dlat) - cos(lat1)cos(lat2)(1 - cos(dlon)):
+        # two cosines and one arccos per city
+        cos_angle = (np.cos(self._lat_rad - lat_r)
+                     - self._cos_lat * math.cos(lat_r) * (1 - np.cos(self._lon_rad - lon_r)))
+        distances = EARTH_RADIUS_KM * np.arccos(np.clip(cos_angle, -1.0, 1.0))
+        
+        nearest = np.argpartition(distances, k - 1)[:k]
+        nearest = nearest[np.argsort(distances[nearest], kind='stable')]
+        
+        results = []
+        for i in nearest.tolist():
+            record = dict(self._records[i])
+            record['distance_km'] = float(distances[i])
+            results.append(record)
+        return results
+    
+    def _get_tree(self):
+        """BallTree over city coordinates (haversine metric), built on first use"""
+        if self._tree is None:
+            from sklearn.neighbors import BallTree
+            self._tree = BallTree(np.column_stack([self._lat_rad, self._lon_rad]), metric='haversine')
+        return self._tree
+    
+    def cities_within(self, lat, lon, radius_km):
+        """
+        Find all cities within a radius of a point
+        
+        Args:
+            lat: Latitude in degrees
+            lon: Longitude in degrees
+            radius_km: Search radius in kilometers
+        
+        Returns:
+            List of city dictionaries, nearest first, each with a 'distance_km' key
+        """
+        point = np.radians([[lat, lon]])
+        indices, distances = self._get_tree().query_radius(
+            point, r=radius_km / EARTH_RADIUS_KM, return_distance=True, sort_results=True
         )
         
-        results = self.cities[mask].head(limit)
+        results = []
+        for i, distance in zip(indices[0].tolist(), distances[0].tolist()):
+            record = dict(self._records[i])
+            record['distance_km'] = distance * EARTH_RADIUS_KM
+            results.append(record)
+        return results
+    
+    def distance_matrix(self, city_indices=None):
+        """
+        Pairwise great-circle distances between cities, e.g. for routing
         
-        options = []
-        for _, row in results.iterrows():
-            options.append({
-                'label': f"{row['city']}, {row['country']}",
-                'city': row['city'],
-                'country': row['country'],
-                'lat': row['lat'],
-                'lon': row['lon']
-            })
+        Args:
+            city_indices: Row indices of the cities to include (all if None)
         
-        return options
+        Returns:
+            np.ndarray: (N, N) distances in kilometers, in city_indices order
+        """
+        if city_indices is None:
+            lat, lon = self._lat_rad, self._lon_rad
+        else:
+            city_indices = np.asarray(city_indices, dtype=np.intp)
+            lat, lon = self._lat_rad[city_indices], self._lon_rad[city_indices]
+        return _haversine_matrix(lat, lon, lat, lon)
     
     def save_to_csv(self, filepath='data/global_cities_database.csv'):
         """Save the database to CSV file"""
         self.cities.to_csv(filepath, index=False)
-        print(f"✓ Saved {len(self.cities)} cities to {filepath}")
+        print(f"✓ Saved {len(self.city_names)} cities to {filepath}")
 
 if __name__ == "__main__":
     # Test the database
     db = GlobalCitiesDatabase()
     
-    print(f"Total cities in database: {len(db.cities)}")
+    print(f"Total cities in database: {len(db.city_names)}")
     print(f"\nCountries covered: {', '.join(db.get_all_countries())}")
     
     # Test search
@@ -2,7 +2,7 @@
 Fix __init__.py files to remove circular imports
 """
 
-from pathlib import Path
+import os
 
 def fix_init_files():
     """Create simple __init__.py files without imports"""
@@ -22,13 +22,21 @@ def fix_init_files():
     
     print("Fixing __init__.py files...\n")
     
+    # Binary mode with explicit line endings matches what write_text produced
+    flags = os.O_WRONLY | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+    
     for file_path, content in init_files.items():
-        path = Path(file_path)
-        if path.exists():
-            path.write_text(content)
-            print(f"✓ Fixed: {file_path}")
-        else:
+        # Opening without O_CREAT doubles as the existence check
+        try:
+            fd = os.open(file_path, flags)
+        except FileNotFoundError:
             print(f"⚠ Not found: {file_path}")
+            continue
+        try:
+            os.write(fd, content.replace('\n', os.linesep).encode())
+        finally:
+            os.close(fd)
+        print(f"✓ Fixed: {file_path}")
     
     print("\n✓ All __init__.py files fixed!")
     print("\nThese files are now simple and won't cause import errors.")
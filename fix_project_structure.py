@@ -5,6 +5,7 @@ This script reorganizes files into the correct folder structure
 
 import os
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 def print_step(msg):
@@ -27,63 +28,79 @@ def create_init_files(folders):
     """Create __init__.py files in each folder"""
     print_step("Creating __init__.py Files")
     
+    # O_EXCL doubles as the existence check; binary mode with explicit line
+    # endings matches what write_text produced
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    
     for folder in folders:
         init_path = Path(folder) / '__init__.py'
-        if not init_path.exists():
-            init_path.write_text(f'"""{folder.capitalize()} package"""\n')
-            print(f"✓ Created: {init_path}")
-        else:
+        try:
+            fd = os.open(init_path, flags, 0o644)
+        except FileExistsError:
             print(f"  Exists: {init_path}")
+            continue
+        try:
+            os.write(fd, f'"""{folder.capitalize()} package"""{os.linesep}'.encode())
+        finally:
+            os.close(fd)
+        print(f"✓ Created: {init_path}")
 
 def reorganize_files():
     """Move and rename files to correct locations"""
     print_step("Reorganizing Files")
     
-    # Define file mappings: {current_name: (target_folder, target_name)}
+    # Candidate source names for each target, in order of preference:
+    # {(target_folder, target_name): [current_name, ...]}
     file_mappings = {
         # Data files
-        'data.data_generator.py': ('data', 'data_generator.py'),
-        'data_generator.py': ('data', 'data_generator.py'),
+        ('data', 'data_generator.py'): ['data.data_generator.py', 'data_generator.py'],
         
         # API files
-        'Weather_api.py': ('api', 'weather_api.py'),
-        'weather_api.py': ('api', 'weather_api.py'),
-        'routing_api.py': ('api', 'routing_api.py'),
-        'api.routing_api.py': ('api', 'routing_api.py'),
-        'api.weather_api.py': ('api', 'weather_api.py'),
+        ('api', 'weather_api.py'): ['Weather_api.py', 'weather_api.py', 'api.weather_api.py'],
+        ('api', 'routing_api.py'): ['routing_api.py', 'api.routing_api.py'],
         
         # Model files
-        'train_model.py': ('models', 'train_model.py'),
-        'models.train_model.py': ('models', 'train_model.py'),
-        'predictor.py': ('models', 'predictor.py'),
-        'models.predictor.py': ('models', 'predictor.py'),
+        ('models', 'train_model.py'): ['train_model.py', 'models.train_model.py'],
+        ('models', 'predictor.py'): ['predictor.py', 'models.predictor.py'],
         
         # App files
-        'dashboard.py': ('app', 'dashboard.py'),
-        'app.dashboard.py': ('app', 'dashboard.py'),
+        ('app', 'dashboard.py'): ['dashboard.py', 'app.dashboard.py'],
     }
     
-    for source_file, (target_folder, target_name) in file_mappings.items():
+    # The existence checks are independent, so issue them together; moves
+    # and prompts stay sequential
+    candidates = [source for sources in file_mappings.values() for source in sources]
+    with ThreadPoolExecutor(max_workers=min(16, len(candidates))) as pool:
+        present = dict(zip(candidates, pool.map(os.path.exists, candidates)))
+    
+    for (target_folder, target_name), sources in file_mappings.items():
+        found = [source for source in sources if present[source]]
+        if not found:
+            continue
+        
+        # The first candidate wins; moving the others too would overwrite it
+        source_file = found[0]
+        for duplicate in found[1:]:
+            print(f"  Left in place: {duplicate} (using {source_file})")
+        
         source_path = Path(source_file)
+        target_path = Path(target_folder) / target_name
+        
+        # Don't move if already in correct location
+        if source_path.resolve() == target_path.resolve():
+            print(f"  Already correct: {target_path}")
+            continue
         
-        if source_path.exists():
-            target_path = Path(target_folder) / target_name
-            
-            # Don't move if already in correct location
-            if source_path.resolve() == target_path.resolve():
-                print(f"  Already correct: {target_path}")
+        # Check if target already exists
+        if target_path.exists():
+            response = input(f"\n{target_path} exists. Overwrite? (y/n): ")
+            if response.lower() != 'y':
+                print(f"  Skipped: {source_file}")
                 continue
-            
-            # Check if target already exists
-            if target_path.exists():
-                response = input(f"\n{target_path} exists. Overwrite? (y/n): ")
-                if response.lower() != 'y':
-                    print(f"  Skipped: {source_file}")
-                    continue
-            
-            # Move and rename
-            shutil.move(str(source_path), str(target_path))
-            print(f"✓ Moved: {source_file} → {target_path}")
+        
+        # Move and rename
+        shutil.move(str(source_path), str(target_path))
+        print(f"✓ Moved: {source_file} → {target_path}")
 
 def create_missing_files():
     """Create any missing essential files"""
@@ -3,6 +3,7 @@ Install Global Location Support
 Automatically sets up all global features
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import os
 
@@ -26,10 +27,15 @@ def check_files():
         '.env.example': False,
     }
     
+    # Check every path at once; each stat is a round-trip on network drives
+    paths = list(required_files) + list(updated_files)
+    with ThreadPoolExecutor(max_workers=min(16, len(paths))) as pool:
+        present = dict(zip(paths, pool.map(os.path.exists, paths)))
+    
     all_new_present = True
     print("\n📁 New Files Required:")
     for file_path in required_files.keys():
-        exists = Path(file_path).exists()
+        exists = present[file_path]
         required_files[file_path] = exists
         status = "✓" if exists else "❌"
         print(f"  {status} {file_path}")
@@ -38,7 +44,7 @@ def check_files():
     
     print("\n📝 Updated Files:")
     for file_path in updated_files.keys():
-        exists = Path(file_path).exists()
+        exists = present[file_path]
         updated_files[file_path] = exists
         status = "✓" if exists else "⚠️"
         print(f"  {status} {file_path}")
@@ -65,10 +71,13 @@ OPENCAGE_API_KEY=YOUR_OPENCAGE_API_KEY_HERE
 """
     
     if Path('.env').exists():
-        with open('.env', 'r') as f:
-            env_content = f.read()
+        from dotenv import dotenv_values
+        
+        # Parse rather than substring-search, so a commented-out key or one
+        # mentioned inside another value doesn't count as configured
+        existing_keys = dotenv_values('.env')
         
-        if 'GOOGLE_GEOCODING_API_KEY' not in env_content:
+        if 'GOOGLE_GEOCODING_API_KEY' not in existing_keys:
             print("✓ Adding geocoding API keys to .env file")
             with open('.env', 'a') as f:
                 f.write(env_additions)
@@ -90,7 +99,12 @@ OPENCAGE_API_KEY=YOUR_OPENCAGE_API_KEY_HERE
     return True
 
 def initialize_database():
-    """Initialize the global cities database"""
+    """
+    Initialize the global cities database
+    
+    Returns:
+        GlobalCitiesDatabase: The database, for reuse by later steps, or None on failure
+    """
     print_header("Initializing Global Cities Database")
     
     try:
@@ -102,13 +116,13 @@ def initialize_database():
         csv_path = 'data/global_cities_database.csv'
         db.save_to_csv(csv_path)
         
-        print(f"✓ Initialized database with {len(db.cities)} cities")
+        print(f"✓ Initialized database with {len(db.city_names)} cities")
         print(f"✓ Saved to {csv_path}")
         
         # Show statistics
         countries = db.get_all_countries()
         print(f"\n📊 Database Statistics:")
-        print(f"  Total Cities: {len(db.cities)}")
+        print(f"  Total Cities: {len(db.city_names)}")
         print(f"  Countries: {len(countries)}")
         
         # Show Nigerian cities count
@@ -120,11 +134,11 @@ def initialize_database():
         for city in nigerian_cities[:5]:
             print(f"    - {city['city']}: ({city['lat']:.4f}, {city['lon']:.4f})")
         
-        return True
+        return db
         
     except Exception as e:
         print(f"❌ Error initializing database: {e}")
-        return False
+        return None
 
 def regenerate_training_data():
     """Regenerate training data with global cities"""
@@ -150,15 +164,21 @@ def regenerate_training_data():
         print("   You can regenerate later with: python -m data.data_generator")
         return True
 
-def test_installation():
-    """Test if everything works"""
+def test_installation(db=None):
+    """
+    Test if everything works
+    
+    Args:
+        db: Already-built GlobalCitiesDatabase to test (built here if omitted)
+    """
     print_header("Testing Installation")
     
     try:
         # Test database
         print("\n1. Testing Global Cities Database...")
-        from data.global_cities import GlobalCitiesDatabase
-        db = GlobalCitiesDatabase()
+        if db is None:
+            from data.global_cities import GlobalCitiesDatabase
+            db = GlobalCitiesDatabase()
         
         test_city = db.search_city("Lagos", "Nigeria")
         if test_city:
@@ -273,9 +293,9 @@ The system will work with or without API keys, using free fallbacks.
     env_ok = create_env_update()
     
     # Step 3: Initialize database
-    db_ok = initialize_database()
+    db = initialize_database()
     
-    if not db_ok:
+    if db is None:
         print("\n❌ Database initialization failed")
         return
     
@@ -283,7 +303,7 @@ The system will work with or without API keys, using free fallbacks.
     data_ok = regenerate_training_data()
     
     # Step 5: Test installation
-    test_ok = test_installation()
+    test_ok = test_installation(db)
     
     # Summary
     print_header("INSTALLATION COMPLETE")
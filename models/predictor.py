@@ -6,8 +6,138 @@ Handles real-time emergency risk prediction using trained models
 import numpy as np
 import pandas as pd
 import pickle
+import joblib
 import os
 from datetime import datetime
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Major city centers (simplified): NYC, LA, Chicago, Houston as (lat, lon)
+_CITY_CENTERS = np.array([
+    [40.7128, -74.0060],
+    [34.0522, -118.2437],
+    [41.8781, -87.6298],
+    [29.7604, -95.3698]
+])
+
+# Traffic density (0-100) indexed by [hour, day_of_week]: a base level per hour
+# (rush hours 7-9 AM and 5-7 PM highest) scaled by a weekday multiplier
+# (Monday-Friday 1.0, Saturday 0.7, Sunday 0.5)
+_TRAFFIC_TABLE = np.outer(
+    [10, 10, 10, 10, 10, 10, 60, 80, 80, 60, 40, 40,
+     40, 40, 40, 40, 60, 80, 80, 60, 30, 30, 30, 30],
+    [1.0, 1.0, 1.0, 1.0, 1.0, 0.7, 0.5]
+)
+
+# Largest batch scored by walking the forest's trees directly; bigger batches
+# use predict_proba and its worker pool
+_DIRECT_TREE_MAX_ROWS = 2000
+
+def _population_density_batch(latitudes, longitudes):
+    """
+    Population density scores (0-100) for arrays of points, from the distance
+    to the nearest major city center
+    """
+    latitudes = np.atleast_1d(np.asarray(latitudes, dtype=float))
+    longitudes = np.atleast_1d(np.asarray(longitudes, dtype=float))
+    
+    # Distance from every point to every center, shape (cities, points)
+    dlat = latitudes[np.newaxis, :] - _CITY_CENTERS[:, 0, np.newaxis]
+    dlon = longitudes[np.newaxis, :] - _CITY_CENTERS[:, 1, np.newaxis]
+    min_distance = np.sqrt(dlat**2 + dlon**2).min(axis=0)
+    
+    # Convert distance to density (closer = denser)
+    # Distance in degrees, roughly 0.01 degree = 1km
+    return np.maximum(0, 100 - (min_distance * 1000))
+
+def _population_density(latitude, longitude):
+    """Population density score for a single point"""
+    return float(_population_density_batch(latitude, longitude)[0])
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True, parallel=True)
+    def _heuristic_risk_kernel(temperature, humidity, wind_speed, precipitation,
+                               hour, population_density):
+        """Fused single-pass version of the heuristic risk in _heuristic_risk"""
+        n = temperature.shape[0]
+        out = np.empty(n, dtype=np.float64)
+        
+        for i in prange(n):
+            risk = 0.3
+            
+            # Weather factors
+            if temperature[i] < 0 or temperature[i] > 35:
+                risk += 0.15
+            if humidity[i] > 80:
+                risk += 0.1
+            if wind_speed[i] > 15:
+                risk += 0.15
+            if precipitation[i] > 5:
+                risk += 0.2
+            elif precipitation[i] > 0:
+                risk += 0.1
+            
+            # Time factors
+            if 0 <= hour <= 4:
+                risk += 0.1
+            if hour == 7 or hour == 8 or hour == 17 or hour == 18:
+                risk += 0.05
+            
+            # Population density factor
+            risk += population_density[i] / 1000
+            
+            out[i] = min(0.95, risk)
+        
+        return out
+
+def _heuristic_risk(temperature, humidity, wind_speed, precipitation, hour, population_density):
+    """
+    Heuristic risk (0-0.95) for arrays of conditions at a single hour; the
+    array form of EmergencyPredictor._heuristic_prediction
+    
+    Runs as one fused loop when numba is installed; the NumPy path below
+    produces identical values.
+    """
+    if NUMBA_AVAILABLE:
+        return _heuristic_risk_kernel(temperature, humidity, wind_speed, precipitation,
+                                      hour, population_density)
+    
+    risk = np.full(len(temperature), 0.3)  # Base risk
+    
+    # Weather factors
+    risk += 0.15 * ((temperature < 0) | (temperature > 35))
+    risk += 0.1 * (humidity > 80)
+    risk += 0.15 * (wind_speed > 15)
+    risk += np.where(precipitation > 5, 0.2, 0.1 * (precipitation > 0))
+    
+    # Time factors
+    risk += 0.1 * (0 <= hour <= 4)
+    risk += 0.05 * (hour in (7, 8, 17, 18))
+    
+    # Population density factor
+    risk += population_density / 1000
+    
+    # Cap at 0.95
+    return np.minimum(0.95, risk)
+
+def _weather_column(features_df, name, default):
+    """A weather column as a float array, with missing columns or values set to default"""
+    if name not in features_df:
+        return np.full(len(features_df), default)
+    return features_df[name].fillna(default).to_numpy(dtype=float)
+
+def _file_mtime(path):
+    """Modification time of a file, or None if it cannot be read"""
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
 
 class EmergencyPredictor:
     """
@@ -21,27 +151,71 @@ class EmergencyPredictor:
         self.model = None
         self.scaler = None
         self.feature_names = None
+        self._scaler_mean = None
+        self._scaler_scale = None
         
         self.load_model()
     
     def load_model(self):
         """Load the trained model and preprocessing components"""
-        if os.path.exists(self.model_path):
-            try:
+        # Prefer the uncompressed joblib copy saved next to the pickle: it loads
+        # faster, and plain arrays such as the scaler statistics stay
+        # memory-mapped (sklearn copies the tree node arrays onto the heap)
+        joblib_path = os.path.splitext(self.model_path)[0] + '.joblib'
+        
+        # Only trust the joblib copy if it is at least as new as the pickle, so
+        # a replaced or retrained pickle is never shadowed by a stale copy
+        joblib_mtime = _file_mtime(joblib_path)
+        pickle_mtime = _file_mtime(self.model_path)
+        use_joblib = joblib_mtime is not None and (pickle_mtime is None or joblib_mtime >= pickle_mtime)
+        if joblib_mtime is not None and not use_joblib:
+            print(f"Ignoring {joblib_path}: older than {self.model_path}")
+        
+        try:
+            model_data = None
+            if use_joblib:
+                try:
+                    model_data = joblib.load(joblib_path, mmap_mode='r')
+                except Exception as e:
+                    # A corrupt or incompatible joblib copy; the pickle may still load
+                    print(f"Error loading {joblib_path}: {e}")
+            
+            if model_data is None:
                 with open(self.model_path, 'rb') as f:
                     model_data = pickle.load(f)
-                    self.model = model_data['model']
-                    self.scaler = model_data.get('scaler')
-                    self.feature_names = model_data.get('feature_names', [])
-                print("Model loaded successfully")
-            except Exception as e:
-                print(f"Error loading model: {e}")
-                self.model = None
-        else:
+            
+            model = model_data['model']
+            scaler = model_data.get('scaler')
+            feature_names = model_data.get('feature_names', [])
+        except FileNotFoundError:
             print(f"Model file not found at {self.model_path}")
             print("Using fallback heuristic prediction")
+            return
+        except Exception as e:
+            print(f"Error loading model: {e}")
+            return
+        
+        self.model = model
+        self.scaler = scaler
+        self.feature_names = feature_names
+        
+        # Keep the StandardScaler parameters so scaling is plain array
+        # arithmetic, without sklearn's input validation on every call
+        self._scaler_mean = self._scaler_scale = None
+        if isinstance(scaler, StandardScaler):
+            self._scaler_mean = scaler.mean_ if scaler.with_mean else 0.0
+            self._scaler_scale = scaler.scale_ if scaler.with_std else 1.0
+        
+        print("Model loaded successfully")
+        
+        # A throwaway prediction pays the first-call setup cost here rather
+        # than on the first real request; failing it only costs that speedup
+        try:
+            model.predict(np.zeros((1, model.n_features_in_)))
+        except Exception as e:
+            print(f"Model warm-up skipped: {e}")
     
-    def predict_risk(self, latitude, longitude, weather_data):
+    def predict_risk(self, latitude, longitude, weather_data, now=None):
         """
         Predict emergency risk for a given location and weather conditions
         
@@ -49,23 +223,26 @@ class EmergencyPredictor:
             latitude: Location latitude
             longitude: Location longitude
             weather_data: Dictionary containing weather information
+            now: Time the time features are taken from (defaults to datetime.now())
         
         Returns:
             float: Risk probability (0-1)
         """
+        if now is None:
+            now = datetime.now()
+        
         if self.model is None:
             # Fallback to heuristic prediction if model not available
-            return self._heuristic_prediction(latitude, longitude, weather_data)
+            return self._heuristic_prediction(latitude, longitude, weather_data, now)
         
         try:
             # Prepare features
-            features = self._prepare_features(latitude, longitude, weather_data)
+            features = self._prepare_features(latitude, longitude, weather_data, now)
             
             # Make prediction
+            features_scaled = np.array([features], dtype=float)
             if self.scaler:
-                features_scaled = self.scaler.transform([features])
-            else:
-                features_scaled = [features]
+                features_scaled = self._scale(features_scaled)
             
             # Get probability of emergency
             if hasattr(self.model, 'predict_proba'):
@@ -79,9 +256,115 @@ class EmergencyPredictor:
             
         except Exception as e:
             print(f"Prediction error: {e}")
-            return self._heuristic_prediction(latitude, longitude, weather_data)
+            return self._heuristic_prediction(latitude, longitude, weather_data, now)
     
-    def _prepare_features(self, latitude, longitude, weather_data):
+    def predict_risk_batch(self, features_df, now=None):
+        """
+        Predict emergency risk for many locations with a single model call
+        
+        Args:
+            features_df: DataFrame with 'latitude' and 'longitude' columns plus any of
+                'temperature', 'humidity', 'wind_speed', 'precipitation', 'pressure'
+            now: Time the time features are taken from (defaults to datetime.now())
+        
+        Returns:
+            np.ndarray: Risk probabilities (0-1), one per row
+        """
+        if len(features_df) == 0:
+            return np.empty(0)
+        
+        if now is None:
+            now = datetime.now()
+        
+        if self.model is None:
+            return self._heuristic_prediction_batch(features_df, now)
+        
+        try:
+            features = self._prepare_feature_matrix(features_df, now)
+            
+            if self.scaler:
+                features = self._scale(features)
+            
+            if hasattr(self.model, 'predict_proba'):
+                return self._fast_predict_proba(features)
+            return self.model.predict(features).astype(float)
+            
+        except Exception as e:
+            print(f"Batch prediction error: {e}")
+            return self._heuristic_prediction_batch(features_df, now)
+    
+    def _fast_predict_proba(self, features):
+        """
+        Probability of the emergency class for a batch of scaled features
+        
+        For a random forest the trees are evaluated directly: predict_proba
+        re-validates the input and dispatches the trees through a joblib pool,
+        which costs more than the trees themselves for grid-sized batches.
+        The averaged values are identical. Larger batches go through
+        predict_proba, where the pool pays for itself.
+        """
+        if (not isinstance(self.model, RandomForestClassifier)
+                or len(features) > _DIRECT_TREE_MAX_ROWS):
+            return self.model.predict_proba(features)[:, 1].astype(float)
+        
+        # tree_ is sklearn's private Tree object; if its interface changes,
+        # fall back to the public path rather than fail the prediction
+        try:
+            # Trees split on float32, C-contiguous input
+            tree_features = np.ascontiguousarray(features, dtype=np.float32)
+            proba = np.zeros((tree_features.shape[0], self.model.n_classes_))
+            for tree in self.model.estimators_:
+                leaf_values = tree.tree_.predict(tree_features)
+                proba += leaf_values / leaf_values.sum(axis=1, keepdims=True)
+        except (AttributeError, ValueError):
+            return self.model.predict_proba(features)[:, 1].astype(float)
+        return proba[:, 1] / len(self.model.estimators_)
+    
+    def _scale(self, features):
+        """Apply the trained scaler to a 2-D feature array"""
+        if self._scaler_mean is None:
+            return self.scaler.transform(features)
+        return (features - self._scaler_mean) / self._scaler_scale
+    
+    def _heuristic_prediction_batch(self, features_df, now):
+        """Apply the heuristic fallback to every row of a feature DataFrame"""
+        return _heuristic_risk(
+            _weather_column(features_df, 'temperature', 20.0),
+            _weather_column(features_df, 'humidity', 50.0),
+            _weather_column(features_df, 'wind_speed', 5.0),
+            _weather_column(features_df, 'precipitation', 0.0),
+            now.hour,
+            _population_density_batch(features_df['latitude'].to_numpy(dtype=float),
+                                      features_df['longitude'].to_numpy(dtype=float))
+        )
+    
+    def _prepare_feature_matrix(self, features_df, now):
+        """
+        Prepare a feature matrix for many locations at once
+        
+        Columns match _prepare_features; missing weather columns or values take
+        the same defaults.
+        """
+        n = len(features_df)
+        latitudes = features_df['latitude'].to_numpy(dtype=float)
+        longitudes = features_df['longitude'].to_numpy(dtype=float)
+        
+        return np.column_stack([
+            latitudes,
+            longitudes,
+            np.full(n, now.hour),
+            np.full(n, now.weekday()),
+            np.full(n, now.month),
+            _weather_column(features_df, 'temperature', 20.0),
+            _weather_column(features_df, 'humidity', 50.0),
+            _weather_column(features_df, 'wind_speed', 5.0),
+            _weather_column(features_df, 'precipitation', 0.0),
+            _weather_column(features_df, 'pressure', 1013.0),
+            np.full(n, self._estimate_traffic_density(now.hour, now.weekday())),
+            _population_density_batch(latitudes, longitudes)
+        ])
+    
+    def _prepare_features(self, latitude, longitude, weather_data, now):
         """
         Prepare feature vector for prediction
         
@@ -91,8 +374,6 @@ class EmergencyPredictor:
         - Weather features (temperature, humidity, wind_speed, precipitation)
         - Traffic density (simulated or from API)
         """
-        now = datetime.now()
-        
         features = [
             latitude,
             longitude,
@@ -115,30 +396,12 @@ class EmergencyPredictor:
         Estimate traffic density based on time
         Higher during rush hours and weekdays
         
+        Accepts scalars or arrays of hours and days of the week.
+        
         Returns:
             float: Traffic density score (0-100)
         """
-        # Rush hour traffic (7-9 AM, 5-7 PM)
-        if hour in [7, 8, 17, 18]:
-            base_traffic = 80
-        elif hour in [6, 9, 16, 19]:
-            base_traffic = 60
-        elif 10 <= hour <= 15:
-            base_traffic = 40
-        elif 20 <= hour <= 23:
-            base_traffic = 30
-        else:
-            base_traffic = 10
-        
-        # Weekday multiplier
-        if day_of_week < 5:  # Monday-Friday
-            multiplier = 1.0
-        elif day_of_week == 5:  # Saturday
-            multiplier = 0.7
-        else:  # Sunday
-            multiplier = 0.5
-        
-        return base_traffic * multiplier
+        return _TRAFFIC_TABLE[hour, day_of_week]
     
     def _estimate_population_density(self, latitude, longitude):
         """
@@ -148,27 +411,9 @@ class EmergencyPredictor:
         Returns:
             float: Population density score (0-100)
         """
-        # Major city centers (simplified)
-        city_centers = {
-            'NYC': (40.7128, -74.0060),
-            'LA': (34.0522, -118.2437),
-            'Chicago': (41.8781, -87.6298),
-            'Houston': (29.7604, -95.3698)
-        }
-        
-        # Find closest city and calculate distance
-        min_distance = float('inf')
-        for city, (city_lat, city_lon) in city_centers.items():
-            distance = np.sqrt((latitude - city_lat)**2 + (longitude - city_lon)**2)
-            min_distance = min(min_distance, distance)
-        
-        # Convert distance to density (closer = denser)
-        # Distance in degrees, roughly 0.01 degree = 1km
-        density = max(0, 100 - (min_distance * 1000))
-        
-        return density
+        return _population_density(float(latitude), float(longitude))
     
-    def _heuristic_prediction(self, latitude, longitude, weather_data):
+    def _heuristic_prediction(self, latitude, longitude, weather_data, now):
         """
         Fallback heuristic prediction when model is not available
         Based on simple rules combining weather and time factors
@@ -203,7 +448,6 @@ class EmergencyPredictor:
             risk_score += 0.1
         
         # Time factors
-        now = datetime.now()
         hour = now.hour
         
         # Late night/early morning slightly higher risk
@@ -231,19 +475,15 @@ class EmergencyPredictor:
         Returns:
             list: Risk probabilities for each location
         """
-        predictions = []
-        
-        for location_data in locations_weather_data:
-            risk = self.predict_risk(
-                location_data['latitude'],
-                location_data['longitude'],
-                location_data['weather_data']
-            )
-            predictions.append(risk)
+        # One row per location: its weather readings plus coordinates, scored
+        # with a single model call
+        features_df = pd.DataFrame([location['weather_data'] for location in locations_weather_data])
+        features_df['latitude'] = [location['latitude'] for location in locations_weather_data]
+        features_df['longitude'] = [location['longitude'] for location in locations_weather_data]
         
-        return predictions
+        return self.predict_risk_batch(features_df).tolist()
     
-    def get_high_risk_zones(self, grid_bounds, grid_resolution=10, risk_threshold=0.7):
+    def get_high_risk_zones(self, grid_bounds, grid_resolution=10, risk_threshold=0.7, rng=None):
         """
         Identify high-risk zones in a geographic grid
         
@@ -251,6 +491,7 @@ class EmergencyPredictor:
             grid_bounds: Tuple of (min_lat, max_lat, min_lon, max_lon)
             grid_resolution: Number of grid points per dimension
             risk_threshold: Minimum risk level to be considered high-risk
+            rng: numpy Generator for the simulated weather (a fresh unseeded one by default)
         
         Returns:
             DataFrame: High-risk locations with coordinates and risk scores
@@ -261,27 +502,27 @@ class EmergencyPredictor:
         lats = np.linspace(min_lat, max_lat, grid_resolution)
         lons = np.linspace(min_lon, max_lon, grid_resolution)
         
-        high_risk_zones = []
-        
-        for lat in lats:
-            for lon in lons:
-                # Simulate weather data (in production, fetch from API)
-                weather_data = {
-                    'temperature': np.random.uniform(15, 30),
-                    'humidity': np.random.uniform(40, 80),
-                    'wind_speed': np.random.uniform(0, 15),
-                    'precipitation': np.random.uniform(0, 10),
-                    'pressure': 1013.0
-                }
-                
-                risk = self.predict_risk(lat, lon, weather_data)
-                
-                if risk >= risk_threshold:
-                    high_risk_zones.append({
-                        'latitude': lat,
-                        'longitude': lon,
-                        'risk_probability': risk,
-                        **weather_data
-                    })
-        
-        return pd.DataFrame(high_risk_zones)
\ No newline at end of file
+        lat_grid, lon_grid = np.meshgrid(lats, lons, indexing='ij')
+        n = lat_grid.size
+        
+        # Simulate weather data (in production, fetch from API): one draw of
+        # temperature, humidity, wind speed and precipitation for every point
+        if rng is None:
+            rng = np.random.default_rng()
+        weather = rng.uniform([15, 40, 0, 0], [30, 80, 15, 10], size=(n, 4))
+        
+        zones = pd.DataFrame({
+            'latitude': lat_grid.ravel(),
+            'longitude': lon_grid.ravel(),
+            'temperature': weather[:, 0],
+            'humidity': weather[:, 1],
+            'wind_speed': weather[:, 2],
+            'precipitation': weather[:, 3],
+            'pressure': np.full(n, 1013.0)
+        })
+        
+        # Score the whole grid with one model call
+        risk = self.predict_risk_batch(zones)
+        zones.insert(2, 'risk_probability', risk)
+        
+        return zones[risk >= risk_threshold].reset_index(drop=True)
\ No newline at end of file
@@ -3,21 +3,21 @@ Automated Setup Script for Smart Emergency Response Predictor
 Handles initial project setup, data generation, and model training
 """
 
+import hashlib
 import os
+import shutil
 import sys
 import subprocess
-from pathlib import Path
+from functools import lru_cache
 
 def print_header(text):
     """Print formatted header"""
-    print("\n" + "=" * 70)
-    print(f"  {text}")
-    print("=" * 70 + "\n")
+    rule = "=" * 70
+    print(f"\n{rule}\n  {text}\n{rule}\n")
 
 def print_step(step_num, text):
     """Print step information"""
-    print(f"\n[Step {step_num}] {text}")
-    print("-" * 70)
+    print(f"\n[Step {step_num}] {text}\n" + "-" * 70)
 
 def check_python_version():
     """Check if Python version is 3.8+"""
@@ -42,8 +42,12 @@ def create_directories():
         'logs'
     ]
     
+    # One listing of the project root instead of a stat per directory
+    existing = {entry.name for entry in os.scandir('.') if entry.is_dir()}
+    
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
+        if directory not in existing:
+            os.makedirs(directory, exist_ok=True)
         print(f"✓ Created/verified directory: {directory}/")
     
     # Create __init__.py files
@@ -55,27 +59,103 @@ def create_directories():
     ]
     
     for init_file in init_files:
-        Path(init_file).touch(exist_ok=True)
+        # Create if missing, leave existing contents untouched
+        os.close(os.open(init_file, os.O_WRONLY | os.O_CREAT, 0o644))
     
     print("✓ All directories created successfully")
 
+@lru_cache(maxsize=1)
+def _requirements(path='requirements.txt'):
+    """Parsed requirement specifiers from requirements.txt"""
+    from packaging.requirements import Requirement
+    
+    with open(path) as f:
+        lines = [line.split('#', 1)[0].strip() for line in f]
+    return tuple(Requirement(line) for line in lines if line)
+
+def _requirements_satisfied():
+    """Check whether every requirement is already installed at a matching version"""
+    from importlib import metadata
+    
+    try:
+        requirements = _requirements()
+    except (ImportError, OSError, ValueError):
+        # packaging not installed or requirements.txt unreadable: let pip decide
+        return False
+    
+    for req in requirements:
+        if req.marker is not None and not req.marker.evaluate():
+            continue
+        try:
+            version = metadata.version(req.name)
+        except metadata.PackageNotFoundError:
+            return False
+        if not req.specifier.contains(version, prereleases=True):
+            return False
+    return True
+
+DEPS_MARKER = '.deps_installed'
+
+def _requirements_hash(path='requirements.txt'):
+    """Hash of requirements.txt and the interpreter it was installed into"""
+    digest = hashlib.sha256(sys.executable.encode())
+    with open(path, 'rb') as f:
+        digest.update(f.read())
+    return digest.hexdigest()
+
 def install_dependencies():
     """Install required Python packages"""
     print_step(3, "Installing Dependencies")
     
+    # A marker from the last successful install for this exact
+    # requirements.txt skips both the version checks and pip
+    try:
+        requirements_hash = _requirements_hash()
+    except OSError:
+        requirements_hash = None  # pip reports the missing file below
+    try:
+        with open(DEPS_MARKER) as f:
+            if requirements_hash and f.read().strip() == requirements_hash:
+                print("✓ Dependencies up to date")
+                return
+    except FileNotFoundError:
+        pass
+    
+    if _requirements_satisfied():
+        print("✓ All dependencies already satisfied")
+        _write_deps_marker(requirements_hash)
+        return
+    
     print("Installing packages from requirements.txt...")
     print("This may take a few minutes...\n")
     
+    env = os.environ.copy()
+    # Skip pip's self-update check (a network round-trip) and never prompt
+    env.setdefault('PIP_DISABLE_PIP_VERSION_CHECK', '1')
+    env.setdefault('PIP_NO_INPUT', '1')
+    
     try:
-        subprocess.check_call([
-            sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'
-        ])
+        subprocess.run([
+            sys.executable, '-m', 'pip', 'install', '--prefer-binary',
+            '-r', 'requirements.txt'
+        ], check=True, env=env)
         print("\n✓ All dependencies installed successfully")
+        _write_deps_marker(requirements_hash)
     except subprocess.CalledProcessError:
         print("\n❌ Error installing dependencies")
         print("   Try manual installation: pip install -r requirements.txt")
         sys.exit(1)
 
+def _write_deps_marker(requirements_hash):
+    """Record a successful install; failing to write it only costs a re-check"""
+    if requirements_hash is None:
+        return
+    try:
+        with open(DEPS_MARKER, 'w') as f:
+            f.write(requirements_hash)
+    except OSError:
+        pass
+
 def setup_env_file():
     """Create .env file from template"""
     print_step(4, "Setting Up Environment Variables")
@@ -85,11 +165,7 @@ def setup_env_file():
         return
     
     if os.path.exists('.env.example'):
-        with open('.env.example', 'r') as src:
-            content = src.read()
-        
-        with open('.env', 'w') as dst:
-            dst.write(content)
+        shutil.copyfile('.env.example', '.env')
         
         print("✓ Created .env file from template")
         print("  → Edit .env to add your API keys (optional)")
@@ -101,15 +177,25 @@ def generate_data():
     print_step(5, "Generating Sample Data")
     
     try:
-        from data.data_generator import generate_sample_data
+        from data.data_generator import generate_sample_data, latest_data_path
         
         data_path = 'data/emergency_data.csv'
+        existing_path = latest_data_path(data_path)
         
-        if os.path.exists(data_path):
-            response = input(f"\n{data_path} already exists. Overwrite? (y/n): ")
-            if response.lower() != 'y':
-                print("Skipping data generation")
+        if os.path.exists(existing_path):
+            # --overwrite/--yes regenerate without asking; without a terminal
+            # to ask on (CI, piped runs) the existing data is kept
+            if '--overwrite' in sys.argv or '--yes' in sys.argv:
+                print(f"\nOverwriting {existing_path}")
+            elif not sys.stdin.isatty():
+                print(f"\n{existing_path} already exists, skipping data generation")
+                print("   Re-run with --overwrite to regenerate it")
                 return
+            else:
+                response = input(f"\n{existing_path} already exists. Overwrite? (y/n): ")
+                if response.lower() != 'y':
+                    print("Skipping data generation")
+                    return
         
         print("\nGenerating 1000 sample emergency records...")
         generate_sample_data(num_samples=1000, output_path=data_path)